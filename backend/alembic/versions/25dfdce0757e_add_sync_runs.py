@@ -0,0 +1,51 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = '25dfdce0757e'
+down_revision: Union[str, None] = '9c6b1586a1cd'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sync_runs',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('max_repos', sa.Integer(), nullable=False),
+    sa.Column('discovery_complete', sa.Boolean(), nullable=False),
+    sa.Column('selected_count', sa.Integer(), nullable=False),
+    sa.Column('synced_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.Column('heartbeat_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.Column('finished_at', sa.TIMESTAMP(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_sync_runs_status', 'sync_runs', ['status'], unique=False)
+    op.create_table('sync_run_items',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('run_id', sa.Integer(), nullable=False),
+    sa.Column('github_id', sa.String(length=20), nullable=False),
+    sa.Column('full_name', sa.String(length=255), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('updated_at', sa.TIMESTAMP(timezone=True), nullable=False),
+    sa.ForeignKeyConstraint(['run_id'], ['sync_runs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('run_id', 'github_id', name='uq_sync_run_item')
+    )
+    op.create_index('idx_sync_run_items_status', 'sync_run_items', ['run_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_sync_run_items_status', table_name='sync_run_items')
+    op.drop_table('sync_run_items')
+    op.drop_index('idx_sync_runs_status', table_name='sync_runs')
+    op.drop_table('sync_runs')
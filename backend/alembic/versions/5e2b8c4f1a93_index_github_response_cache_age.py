@@ -0,0 +1,18 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '5e2b8c4f1a93'
+down_revision: Union[str, None] = '7d1e5a3c9b04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_github_response_cache_fetched_at', 'github_response_cache', ['fetched_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_github_response_cache_fetched_at', table_name='github_response_cache')
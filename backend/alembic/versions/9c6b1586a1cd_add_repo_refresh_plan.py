@@ -0,0 +1,22 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '9c6b1586a1cd'
+down_revision: Union[str, None] = 'e8797b41bb45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('repositories', sa.Column('refresh_priority', sa.Float(), nullable=False, server_default='0.0'))
+    op.add_column('repositories', sa.Column('next_refresh_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.create_index('idx_repos_next_refresh', 'repositories', ['next_refresh_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_repos_next_refresh', table_name='repositories')
+    op.drop_column('repositories', 'next_refresh_at')
+    op.drop_column('repositories', 'refresh_priority')
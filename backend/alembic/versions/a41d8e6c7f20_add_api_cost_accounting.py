@@ -0,0 +1,21 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision: str = 'a41d8e6c7f20'
+down_revision: Union[str, None] = '3b7e2a9d41c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sync_runs', sa.Column('api_cost', postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default='{}'))
+    op.add_column('repositories', sa.Column('sync_cost', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('repositories', 'sync_cost')
+    op.drop_column('sync_runs', 'api_cost')
@@ -0,0 +1,22 @@
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = 'f58f0dc6dcc8'
+down_revision: Union[str, None] = '25dfdce0757e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('sync_run_items', sa.Column('claimed_by', sa.String(length=100), nullable=True))
+    op.add_column('sync_run_items', sa.Column('claimed_at', sa.TIMESTAMP(timezone=True), nullable=True))
+    op.create_index('idx_sync_run_items_claim', 'sync_run_items', ['status', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_sync_run_items_claim', table_name='sync_run_items')
+    op.drop_column('sync_run_items', 'claimed_at')
+    op.drop_column('sync_run_items', 'claimed_by')
@@ -4,6 +4,7 @@ from redis.asyncio import Redis
 
 from app.core.dependencies import get_redis
 from app.services.github_client import github_client
+from app.services.sync_pipeline import pipeline_stats
 
 router = APIRouter(tags=["Health"])
 
@@ -16,6 +17,9 @@ async def health_check(
         "status": "healthy",
         "redis": "unknown",
         "github_rate_remaining": github_client.rate_remaining,
+        "github_conditional_cache": github_client.conditional_cache_stats,
+        "github_scheduler": github_client.scheduler_stats,
+        "sync_pipeline": pipeline_stats(),
     }
 
     if redis is None:
@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dependencies import get_db, require_admin
+from app.models.repository import Repository
+from app.models.sync_run import SyncRun
+from app.services.api_costs import process_totals, recent_ledgers
+from app.services.github_client import github_client
+from app.services.refresh_planner import (
+    load_cost_model,
+    push_to_front,
+    request_budget,
+    select_due_repos,
+)
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/refresh-queue")
+async def get_refresh_queue(
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+):
+    result = await db.execute(
+        select(Repository)
+        .where(Repository.is_active == True)  # noqa
+        .order_by(Repository.next_refresh_at.asc().nulls_first(), Repository.refresh_priority.desc())
+        .limit(limit)
+    )
+    now = datetime.now(timezone.utc)
+    return {
+        "budget": await request_budget(),
+        "data": [
+            {
+                "full_name": repo.full_name,
+                "refresh_priority": repo.refresh_priority,
+                "next_refresh_at": repo.next_refresh_at.isoformat() if repo.next_refresh_at else None,
+                "due": repo.next_refresh_at is None or repo.next_refresh_at <= now,
+                "synced_at": repo.synced_at.isoformat() if repo.synced_at else None,
+            }
+            for repo in result.scalars().all()
+        ],
+    }
+
+
+@router.post("/refresh-queue")
+async def prioritize_refresh(
+    repos: str = Query(..., description="Comma-separated owner/name list"),
+    db: AsyncSession = Depends(get_db),
+):
+    full_names = [r.strip() for r in repos.split(",") if r.strip()]
+    queued = await push_to_front(db, full_names)
+    await db.commit()
+    return {
+        "queued": queued,
+        "unknown": [name for name in full_names if name not in queued],
+    }
+
+
+@router.get("/api-costs")
+async def get_api_costs(
+    runs: int = Query(10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    budget = await request_budget()
+    reset_at = github_client.rate_reset_at
+    cost_model = await load_cost_model(db)
+    plan = await select_due_repos(db, budget)
+
+    active_repos = await db.scalar(
+        select(func.count(Repository.id)).where(Repository.is_active == True)  # noqa
+    )
+    catalog_cost = sum(cost_model.costs.values()) + cost_model.default * max(
+        active_repos - len(cost_model.costs), 0
+    )
+    hourly_quota = max(github_client.rate_limit, 1)
+
+    recent_runs = await db.execute(
+        select(SyncRun).order_by(SyncRun.started_at.desc()).limit(runs)
+    )
+    return {
+        "budget": {
+            "remaining": github_client.rate_remaining,
+            "spendable": budget,
+            "reset_at": (
+                datetime.fromtimestamp(reset_at, tz=timezone.utc).isoformat() if reset_at else None
+            ),
+        },
+        "cost_per_repo": {
+            "median": round(cost_model.default, 2),
+            "tracked_repos": len(cost_model.costs),
+        },
+        "catalog": {
+            "active_repos": active_repos,
+            "full_refresh_requests": round(catalog_cost),
+            "hourly_quota": hourly_quota,
+            "full_refresh_hours": round(catalog_cost / hourly_quota, 2),
+        },
+        "plan": [
+            {
+                "full_name": repo.full_name,
+                "refresh_priority": repo.refresh_priority,
+                "cost": round(cost_model.cost(repo.github_id), 2),
+            }
+            for repo in plan
+        ],
+        "runs": [
+            {
+                "id": run.id,
+                "kind": run.kind,
+                "status": run.status,
+                "started_at": run.started_at.isoformat() if run.started_at else None,
+                "synced_count": run.synced_count,
+                "endpoints": run.api_cost,
+            }
+            for run in recent_runs.scalars().all()
+        ],
+        "process": {
+            "totals": process_totals.stats()["endpoints"],
+            "recent": list(recent_ledgers),
+        },
+    }
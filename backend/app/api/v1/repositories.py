@@ -70,8 +70,9 @@ async def live_search_repositories(
         synced_repos = []
         for repo_data in items[:per_page]:
             try:
-                repo = await sync_single_repo(db, repo_data)
-                if repo:
+                changes = await sync_single_repo(db, repo_data)
+                if changes:
+                    repo = changes.repo
                     synced_repos.append({
                         "id": repo.id,
                         "full_name": repo.full_name,
@@ -94,7 +95,7 @@ async def live_search_repositories(
                     })
             except Exception as e:
                 import logging
-                logging.getLogger(__name__).warning("Live sync failed for %s: %s", repo_data.get("full_name"), e)
+                logging.getLogger(__name__).warning("Live sync failed for %s: %s", repo_data.full_name, e)
                 continue
 
         return {
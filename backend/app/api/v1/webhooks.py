@@ -0,0 +1,64 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.core.cache import CacheService
+from app.core.dependencies import get_cache, get_db
+from app.services.github_records import decode_json
+from app.services.webhooks import (
+    SUPPORTED_EVENTS,
+    apply_event,
+    claim_delivery,
+    invalidate_repo_caches,
+    release_delivery,
+    verify_signature,
+)
+
+router = APIRouter(prefix="/webhooks", tags=["Webhooks"])
+
+
+@router.post("/github")
+async def receive_github_webhook(
+    request: Request,
+    x_github_event: str = Header(...),
+    x_github_delivery: str | None = Header(None),
+    x_hub_signature_256: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+    cache: CacheService = Depends(get_cache),
+):
+    if not settings.github_webhook_secret:
+        raise HTTPException(status_code=403, detail="Webhook receiver is disabled")
+
+    body = await request.body()
+    if not verify_signature(settings.github_webhook_secret, body, x_hub_signature_256):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    if x_github_event not in SUPPORTED_EVENTS:
+        return {"event": x_github_event, "applied": False}
+
+    try:
+        payload = decode_json(body)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Webhook payload must be JSON")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Webhook payload must be JSON")
+
+    if not await claim_delivery(cache.redis, x_github_delivery):
+        return {"event": x_github_event, "applied": False, "duplicate": True}
+
+    try:
+        result = await apply_event(db, x_github_event, payload)
+        await db.commit()
+    except Exception:
+        await release_delivery(cache.redis, x_github_delivery)
+        raise
+
+    if result.applied:
+        await invalidate_repo_caches(cache, result)
+    return {
+        "event": result.event,
+        "action": result.action,
+        "applied": result.applied,
+        "changed": result.fields,
+        "issues": result.issues,
+    }
@@ -1,6 +1,8 @@
 
+import hmac
 from typing import AsyncGenerator
 
+from fastapi import Header, HTTPException
 from redis.asyncio import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -48,3 +50,10 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
 async def get_cache() -> CacheService:
     redis = await get_redis()
     return CacheService(redis)
+
+
+async def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    if not settings.admin_token:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
@@ -7,8 +7,8 @@ from app.config import settings
 engine = create_async_engine(
     settings.database_url,
     echo=settings.app_debug,
-    pool_size=5,
-    max_overflow=10,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
     pool_pre_ping=True,
 )
 
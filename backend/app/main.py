@@ -23,13 +23,14 @@ async def lifespan(app: FastAPI):
 
     from app.tasks.scheduler import start_scheduler, stop_scheduler
 
-    if settings.app_env != "testing":
+    run_scheduler = settings.scheduler_in_api and settings.app_env != "testing"
+    if run_scheduler:
         start_scheduler()
 
     yield
 
     logger.info("🛑 Shutting down OpenFirst API")
-    if settings.app_env != "testing":
+    if run_scheduler:
         stop_scheduler()
     await close_redis()
 
@@ -64,16 +65,20 @@ async def openfirst_error_handler(request: Request, exc: OpenFirstError):
 
 
 from app.api.health import router as health_router
+from app.api.v1.admin import router as admin_router
 from app.api.v1.repositories import router as repo_router
 from app.api.v1.issues import router as issue_router
 from app.api.v1.stats import router as stats_router
 from app.api.v1.subscriptions import router as sub_router
+from app.api.v1.webhooks import router as webhook_router
 
 app.include_router(health_router)
 app.include_router(repo_router, prefix="/v1")
 app.include_router(issue_router, prefix="/v1")
 app.include_router(stats_router, prefix="/v1")
 app.include_router(sub_router, prefix="/v1")
+app.include_router(admin_router, prefix="/v1")
+app.include_router(webhook_router, prefix="/v1")
 
 
 @app.get("/", include_in_schema=False)
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+from sqlalchemy import Index, LargeBinary, String, Text, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class GitHubResponseCache(Base):
+    __tablename__ = "github_response_cache"
+
+    cache_key: Mapped[str] = mapped_column(String(64), primary_key=True)
+    url: Mapped[str] = mapped_column(Text, nullable=False)
+    etag: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    last_modified: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    link: Mapped[str | None] = mapped_column(Text, nullable=True)
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.utcnow
+    )
+
+    __table_args__ = (
+        Index("idx_github_response_cache_fetched_at", "fetched_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<GitHubResponseCache {self.url} etag={self.etag}>"
@@ -0,0 +1,23 @@
+from datetime import datetime
+
+from sqlalchemy import ForeignKey, Integer, LargeBinary, TIMESTAMP
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class RepoPayload(Base):
+    __tablename__ = "repo_payloads"
+
+    repo_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("repositories.id", ondelete="CASCADE"), primary_key=True
+    )
+    version: Mapped[int] = mapped_column(Integer, nullable=False)
+    payload: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    raw_size: Mapped[int] = mapped_column(Integer, default=0)
+    fetched_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.utcnow
+    )
+
+    def __repr__(self) -> str:
+        return f"<RepoPayload repo={self.repo_id} v{self.version} {len(self.payload)}B>"
@@ -57,6 +57,10 @@ class Repository(Base):
     raw_metadata: Mapped[dict] = mapped_column(JSONB, default=dict)
 
     synced_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    refresh_priority: Mapped[float] = mapped_column(Float, default=0.0)
+    next_refresh_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    webhook_event_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    sync_cost: Mapped[float | None] = mapped_column(Float, nullable=True)
     created_in_db: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), default=datetime.utcnow
     )
@@ -76,6 +80,7 @@ class Repository(Base):
         Index("idx_repos_language", "primary_language"),
         Index("idx_repos_stars", "stars"),
         Index("idx_repos_synced", "synced_at"),
+        Index("idx_repos_next_refresh", "next_refresh_at"),
     )
 
     def __repr__(self) -> str:
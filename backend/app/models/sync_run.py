@@ -0,0 +1,69 @@
+from datetime import datetime
+
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, String, Text, TIMESTAMP, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.database import Base
+
+
+class SyncRun(Base):
+    __tablename__ = "sync_runs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    kind: Mapped[str] = mapped_column(String(20), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="running")
+    max_repos: Mapped[int] = mapped_column(Integer, default=0)
+    discovery_complete: Mapped[bool] = mapped_column(Boolean, default=False)
+    distributed: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    selected_count: Mapped[int] = mapped_column(Integer, default=0)
+    synced_count: Mapped[int] = mapped_column(Integer, default=0)
+    failed_count: Mapped[int] = mapped_column(Integer, default=0)
+    api_cost: Mapped[dict] = mapped_column(JSONB, default=dict)
+
+    started_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.utcnow
+    )
+    heartbeat_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+
+    items = relationship("SyncRunItem", back_populates="run", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("idx_sync_runs_status", "status"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SyncRun {self.id} {self.kind} {self.status}>"
+
+
+class SyncRunItem(Base):
+    __tablename__ = "sync_run_items"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    run_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("sync_runs.id", ondelete="CASCADE"), nullable=False
+    )
+    github_id: Mapped[str] = mapped_column(String(20), nullable=False)
+    full_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    payload: Mapped[dict] = mapped_column(JSONB, default=dict)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    claimed_by: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    claimed_at: Mapped[datetime | None] = mapped_column(TIMESTAMP(timezone=True), nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    run = relationship("SyncRun", back_populates="items")
+
+    __table_args__ = (
+        UniqueConstraint("run_id", "github_id", name="uq_sync_run_item"),
+        Index("idx_sync_run_items_status", "run_id", "status"),
+        Index("idx_sync_run_items_claim", "status", "id"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<SyncRunItem run={self.run_id} {self.full_name} {self.status}>"
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import time
+
+from app.config import settings
+from app.replay.fixtures import recording_date
+
+logger = logging.getLogger(__name__)
+
+
+async def _start_fake_server(args) -> tuple[asyncio.Task, object]:
+    import uvicorn
+
+    from app.replay.fake_server import create_app
+
+    app = create_app(
+        args.fixtures,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+    )
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=args.port, log_level="warning")
+    )
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    settings.github_api_base = f"http://127.0.0.1:{args.port}"
+    settings.sync_today = recording_date(args.fixtures)
+    return task, server
+
+
+async def run_benchmark(args) -> dict:
+    server_task = server = None
+    if args.fixtures:
+        server_task, server = await _start_fake_server(args)
+
+    from app.services.github_client import github_client
+    from app.services.github_sync import run_full_sync
+
+    try:
+        requests_before = github_client.total_requests
+        start = time.perf_counter()
+        synced = await run_full_sync(max_repos=args.max_repos)
+        elapsed = time.perf_counter() - start
+        requests = github_client.total_requests - requests_before
+    finally:
+        await github_client.close()
+        if server is not None:
+            server.should_exit = True
+            await server_task
+
+    return {
+        "repos_synced": synced,
+        "wall_time_s": round(elapsed, 2),
+        "repos_per_s": round(synced / elapsed, 3) if elapsed else 0.0,
+        "requests": requests,
+        "requests_per_repo": round(requests / synced, 2) if synced else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark a full GitHub sync")
+    parser.add_argument("--max-repos", type=int, default=50)
+    parser.add_argument("--fixtures", help="Replay recorded fixtures from this directory")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=5000)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+    )
+    result = asyncio.run(run_benchmark(args))
+    for key, value in result.items():
+        print(f"{key:>20}: {value}")
+
+
+if __name__ == "__main__":
+    main()
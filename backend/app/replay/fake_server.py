@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import parse_qsl
+
+import orjson
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from app.replay.fixtures import fixture_key, normalize_query, recording_date
+
+logger = logging.getLogger(__name__)
+
+
+class FixtureIndex:
+
+    def __init__(self, directory: str | Path):
+        self.by_key: dict[str, dict] = {}
+        self.by_path: dict[tuple[str, str], list[dict]] = defaultdict(list)
+
+        for path in sorted(Path(directory).glob("*.json")):
+            fixture = orjson.loads(path.read_bytes())
+            body = (fixture.get("request_body") or "").encode()
+            key = fixture_key(fixture["method"], fixture["path"], fixture["query"], body)
+            self.by_key[key] = fixture
+            self.by_path[(fixture["method"], fixture["path"])].append(fixture)
+
+        self.recorded_on = recording_date(directory)
+        logger.info("Loaded %d fixtures from %s", len(self.by_key), directory)
+        if self.recorded_on is not None:
+            logger.info("Fixtures were recorded on %s — replay with SYNC_TODAY=%s", self.recorded_on, self.recorded_on)
+
+    def match(self, method: str, path: str, query: str, body: bytes) -> dict | None:
+        exact = self.by_key.get(fixture_key(method, path, query, body))
+        if exact is not None:
+            return exact
+
+        candidates = self.by_path.get((method, path))
+        if not candidates or path.startswith("/search/"):
+            return None
+
+        page = dict(_pairs(query)).get("page")
+        for fixture in candidates:
+            if dict(_pairs(fixture["query"])).get("page") == page:
+                return fixture
+        return candidates[0]
+
+
+def _pairs(query: str) -> list[tuple[str, str]]:
+    return parse_qsl(normalize_query(query), keep_blank_values=True)
+
+
+class RateLimitSimulator:
+
+    def __init__(self, limit: int, window_seconds: int):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._used: dict[tuple[str, str], int] = defaultdict(int)
+        self._reset: dict[tuple[str, str], float] = {}
+
+    def consume(self, token: str, resource: str) -> tuple[dict[str, str], bool]:
+        key = (token, resource)
+        now = time.time()
+        if self._reset.get(key, 0) <= now:
+            self._reset[key] = now + self.window_seconds
+            self._used[key] = 0
+
+        limit = self.limit if resource != "search" else max(self.limit // 150, 1)
+        self._used[key] += 1
+        remaining = max(limit - self._used[key], 0)
+        headers = {
+            "x-ratelimit-limit": str(limit),
+            "x-ratelimit-remaining": str(remaining),
+            "x-ratelimit-reset": str(int(self._reset[key])),
+            "x-ratelimit-used": str(min(self._used[key], limit)),
+            "x-ratelimit-resource": resource,
+        }
+        return headers, self._used[key] > limit
+
+
+def create_app(
+    fixtures_dir: str | Path,
+    latency_ms: float = 0.0,
+    latency_jitter_ms: float = 0.0,
+    error_rate: float = 0.0,
+    rate_limit: int = 5000,
+    rate_window_seconds: int = 3600,
+) -> FastAPI:
+    index = FixtureIndex(fixtures_dir)
+    limiter = RateLimitSimulator(rate_limit, rate_window_seconds)
+    stats: dict[str, int] = defaultdict(int)
+
+    app = FastAPI(title="Fake GitHub API")
+
+    @app.get("/_stats", include_in_schema=False)
+    async def get_stats():
+        return dict(stats)
+
+    @app.api_route("/{path:path}", methods=["GET", "POST"])
+    async def replay(path: str, request: Request):
+        stats["requests"] += 1
+        delay = latency_ms + random.uniform(0, latency_jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        request_path = "/" + path
+        if request_path.startswith("/search/"):
+            resource = "search"
+        elif request_path.startswith("/graphql"):
+            resource = "graphql"
+        else:
+            resource = "core"
+        token = request.headers.get("authorization", "anonymous")
+        rate_headers, exceeded = limiter.consume(token, resource)
+
+        if exceeded:
+            stats["rate_limited"] += 1
+            return JSONResponse(
+                {"message": "API rate limit exceeded"}, status_code=403, headers=rate_headers
+            )
+
+        if error_rate and random.random() < error_rate:
+            stats["injected_errors"] += 1
+            return JSONResponse({"message": "Server Error"}, status_code=502, headers=rate_headers)
+
+        body = await request.body() if request.method != "GET" else b""
+        fixture = index.match(request.method, request_path, request.url.query, body)
+        if fixture is None:
+            stats["misses"] += 1
+            return JSONResponse({"message": "Not Found"}, status_code=404, headers=rate_headers)
+
+        stats["hits"] += 1
+        headers = {**fixture["headers"], **rate_headers}
+        media_type = headers.pop("content-type", "application/json")
+        if request.headers.get("if-none-match") and request.headers["if-none-match"] == headers.get("etag"):
+            stats["not_modified"] += 1
+            return Response(status_code=304, headers=rate_headers)
+
+        return Response(
+            content=fixture["body"],
+            status_code=fixture["status"],
+            headers=headers,
+            media_type=media_type,
+        )
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Replay recorded GitHub responses")
+    parser.add_argument("--fixtures", required=True)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--latency-jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=int, default=5000)
+    parser.add_argument("--rate-window", type=int, default=3600)
+    args = parser.parse_args()
+
+    app = create_app(
+        args.fixtures,
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_window_seconds=args.rate_window,
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
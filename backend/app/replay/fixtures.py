@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import date
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode
+
+RECORDING_DATE_FILE = "recorded_on.txt"
+
+RECORDED_HEADERS = {
+    "content-type",
+    "etag",
+    "last-modified",
+    "link",
+    "x-ratelimit-limit",
+    "x-ratelimit-remaining",
+    "x-ratelimit-reset",
+    "x-ratelimit-resource",
+    "x-ratelimit-used",
+    "retry-after",
+}
+
+
+def normalize_query(query: str | bytes) -> str:
+    if isinstance(query, bytes):
+        query = query.decode()
+    return urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+
+
+def fixture_key(method: str, path: str, query: str | bytes = "", body: bytes = b"") -> str:
+    raw = f"{method.upper()} {path}?{normalize_query(query)}".encode()
+    if body:
+        raw += b"\n" + body
+    return hashlib.sha256(raw).hexdigest()[:24]
+
+
+def fixture_path(directory: str | Path, key: str) -> Path:
+    return Path(directory) / f"{key}.json"
+
+
+def write_recording_date(directory: str | Path, day: date):
+    (Path(directory) / RECORDING_DATE_FILE).write_text(day.isoformat())
+
+
+def recording_date(directory: str | Path) -> date | None:
+    path = Path(directory) / RECORDING_DATE_FILE
+    if not path.exists():
+        return None
+    return date.fromisoformat(path.read_text().strip())
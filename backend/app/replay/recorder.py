@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import orjson
+
+from app.replay.fixtures import RECORDED_HEADERS, fixture_key, fixture_path, write_recording_date
+
+logger = logging.getLogger(__name__)
+
+
+class FixtureRecorder:
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        write_recording_date(self.directory, datetime.now(timezone.utc).date())
+        self.recorded = 0
+
+    async def __call__(self, response: httpx.Response):
+        request = response.request
+        if response.status_code == 304:
+            return
+
+        await response.aread()
+        body = request.content if request.method != "GET" else b""
+        key = fixture_key(request.method, request.url.path, request.url.query, body)
+        fixture = {
+            "method": request.method,
+            "path": request.url.path,
+            "query": request.url.query.decode(),
+            "request_body": body.decode() if body else None,
+            "status": response.status_code,
+            "headers": {
+                k: v for k, v in response.headers.items() if k.lower() in RECORDED_HEADERS
+            },
+            "body": response.text,
+        }
+        fixture_path(self.directory, key).write_bytes(
+            orjson.dumps(fixture, option=orjson.OPT_INDENT_2)
+        )
+        self.recorded += 1
+        logger.debug("Recorded %s %s -> %s", request.method, request.url, key)
@@ -0,0 +1,199 @@
+import logging
+import re
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator
+
+from sqlalchemy import select, update
+
+from app.database import async_session_factory
+from app.models.repository import Repository
+from app.models.sync_run import SyncRun
+from app.services.request_scheduler import resource_for_path
+
+logger = logging.getLogger(__name__)
+
+COST_SMOOTHING = 0.3
+RECENT_LEDGERS = 20
+
+_REPO_PATH_RE = re.compile(r"^/repos/[^/]+/[^/]+(?:/(?P<rest>[^?]*))?")
+_REPO_ENDPOINTS = {
+    "": "repo",
+    "languages": "languages",
+    "issues": "issues",
+    "pulls": "pulls",
+    "contributors": "contributors",
+    "community/profile": "community",
+}
+
+
+def endpoint_type(url: str) -> str:
+    if url.startswith("/search/"):
+        return "search_" + url.removeprefix("/search/").split("?", 1)[0]
+    if url.startswith("/graphql"):
+        return "graphql"
+    match = _REPO_PATH_RE.match(url)
+    if match:
+        return _REPO_ENDPOINTS.get((match.group("rest") or "").rstrip("/"), "repo_other")
+    return "other"
+
+
+@dataclass(slots=True)
+class EndpointStats:
+    requests: int = 0
+    not_modified: int = 0
+    errors: int = 0
+    bytes: int = 0
+    latency_ms: float = 0.0
+
+    def add(self, status: int, size: int, latency_ms: float):
+        self.requests += 1
+        if status == 304:
+            self.not_modified += 1
+        elif status >= 400:
+            self.errors += 1
+        self.bytes += size
+        self.latency_ms += latency_ms
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "not_modified": self.not_modified,
+            "errors": self.errors,
+            "bytes": self.bytes,
+            "avg_latency_ms": round(self.latency_ms / self.requests, 1) if self.requests else 0.0,
+        }
+
+
+def merge_endpoint_stats(stored: dict, added: dict) -> dict:
+    merged = {endpoint: dict(values) for endpoint, values in (stored or {}).items()}
+    for endpoint, values in added.items():
+        current = merged.setdefault(endpoint, {})
+        total = current.get("requests", 0) + values["requests"]
+        latency = (
+            current.get("avg_latency_ms", 0.0) * current.get("requests", 0)
+            + values["avg_latency_ms"] * values["requests"]
+        )
+        current.update({
+            "requests": total,
+            "not_modified": current.get("not_modified", 0) + values["not_modified"],
+            "errors": current.get("errors", 0) + values["errors"],
+            "bytes": current.get("bytes", 0) + values["bytes"],
+            "avg_latency_ms": round(latency / total, 1) if total else 0.0,
+        })
+    return merged
+
+
+class CostLedger:
+
+    def __init__(self, label: str, run_id: int | None = None):
+        self.label = label
+        self.run_id = run_id
+        self.endpoints: dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self.repo_costs: dict[str, float] = defaultdict(float)
+
+    def record(self, endpoint: str, status: int, size: int, latency_ms: float, repos: tuple[str, ...]):
+        self.endpoints[endpoint].add(status, size, latency_ms)
+        if repos and status != 304:
+            share = 1 / len(repos)
+            for repo in repos:
+                self.repo_costs[repo] += share
+
+    @property
+    def charged_requests(self) -> int:
+        return sum(s.requests - s.not_modified for s in self.endpoints.values())
+
+    def stats(self) -> dict:
+        return {
+            "label": self.label,
+            "run_id": self.run_id,
+            "charged_requests": self.charged_requests,
+            "repos": len(self.repo_costs),
+            "avg_cost_per_repo": (
+                round(sum(self.repo_costs.values()) / len(self.repo_costs), 2)
+                if self.repo_costs else None
+            ),
+            "endpoints": {name: s.stats() for name, s in sorted(self.endpoints.items())},
+        }
+
+
+_current_ledger: ContextVar[CostLedger | None] = ContextVar("github_cost_ledger", default=None)
+_current_repos: ContextVar[tuple[str, ...]] = ContextVar("github_cost_repos", default=())
+
+process_totals = CostLedger("process")
+recent_ledgers: deque[dict] = deque(maxlen=RECENT_LEDGERS)
+
+
+def record_request(url: str, status: int, size: int, latency_ms: float):
+    endpoint = endpoint_type(url)
+    repos = _current_repos.get() if resource_for_path(url) != "search" else ()
+    process_totals.record(endpoint, status, size, latency_ms, ())
+    ledger = _current_ledger.get()
+    if ledger is not None:
+        ledger.record(endpoint, status, size, latency_ms, repos)
+
+
+@contextmanager
+def charge_repos(*full_names: str) -> Iterator[None]:
+    token = _current_repos.set(tuple(full_names))
+    try:
+        yield
+    finally:
+        _current_repos.reset(token)
+
+
+@asynccontextmanager
+async def cost_scope(label: str, run_id: int | None = None) -> AsyncIterator[CostLedger]:
+    outer = _current_ledger.get()
+    if outer is not None:
+        yield outer
+        return
+
+    ledger = CostLedger(label, run_id)
+    token = _current_ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        _current_ledger.reset(token)
+        recent_ledgers.append(ledger.stats())
+        try:
+            await _persist(ledger)
+        except Exception as e:
+            logger.error("Failed to persist API costs for %s: %s", label, e)
+
+
+async def _persist(ledger: CostLedger):
+    stats = ledger.stats()
+    logger.info(
+        "GitHub cost for %s: %d charged requests, %s per repo across %d repos",
+        ledger.label, stats["charged_requests"], stats["avg_cost_per_repo"], stats["repos"],
+    )
+
+    async with async_session_factory() as session:
+        if ledger.run_id is not None and ledger.endpoints:
+            run = (
+                await session.execute(
+                    select(SyncRun).where(SyncRun.id == ledger.run_id).with_for_update()
+                )
+            ).scalar_one_or_none()
+            if run is not None:
+                run.api_cost = merge_endpoint_stats(run.api_cost, stats["endpoints"])
+
+        if ledger.repo_costs:
+            rows = (
+                await session.execute(
+                    select(Repository.id, Repository.full_name, Repository.sync_cost)
+                    .where(Repository.full_name.in_(list(ledger.repo_costs)))
+                )
+            ).all()
+            updates = []
+            for row in rows:
+                cost = ledger.repo_costs[row.full_name]
+                if row.sync_cost is not None:
+                    cost = row.sync_cost + COST_SMOOTHING * (cost - row.sync_cost)
+                updates.append({"id": row.id, "sync_cost": round(cost, 2)})
+            if updates:
+                await session.execute(update(Repository), updates)
+        await session.commit()
@@ -1,16 +1,31 @@
 
 import asyncio
 import logging
+import re
 import time
-from typing import Any
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable
 
 import httpx
 
 from app.config import settings
 from app.core.exceptions import GitHubAPIError, RateLimitExceededError
+from app.core.singleflight import SingleFlight
+from app.services.api_costs import record_request
+from app.services.github_records import (
+    IssueRecord,
+    PullRecord,
+    RepoRecord,
+    decode_json,
+)
+from app.services.request_scheduler import RequestScheduler, resource_for_path
+from app.services.response_cache import ConditionalResponseStore
+from app.services.shared_budget import SharedBudgetStore
 
 logger = logging.getLogger(__name__)
 
+_LAST_PAGE_RE = re.compile(r'<[^>]*[?&]page=(\d+)[^>]*>;\s*rel="last"')
+
 
 class GitHubClient:
 
@@ -19,19 +34,31 @@ class GitHubClient:
             "Accept": "application/vnd.github+json",
             "X-GitHub-Api-Version": "2022-11-28",
         }
-        if settings.github_pat:
-            self._headers["Authorization"] = f"Bearer {settings.github_pat}"
 
         self._client: httpx.AsyncClient | None = None
-        self._rate_remaining: int = 5000
-        self._rate_reset: float = 0
+        self._scheduler = RequestScheduler(
+            tokens=settings.github_token_list,
+            max_concurrency=settings.github_max_concurrency,
+            min_concurrency=settings.github_min_concurrency,
+            max_rate_wait=settings.github_rate_limit_max_wait,
+            shared=SharedBudgetStore(settings.redis_url) if settings.github_shared_budgets else None,
+        )
+        self._response_store = ConditionalResponseStore()
+        self._inflight = SingleFlight()
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
+            event_hooks = {}
+            if settings.github_record_dir:
+                from app.replay.recorder import FixtureRecorder
+                event_hooks["response"] = [FixtureRecorder(settings.github_record_dir)]
+
             self._client = httpx.AsyncClient(
                 base_url=settings.github_api_base,
                 headers=self._headers,
                 timeout=30.0,
+                limits=httpx.Limits(max_connections=settings.github_max_concurrency * 2),
+                event_hooks=event_hooks,
             )
         return self._client
 
@@ -39,22 +66,17 @@ class GitHubClient:
         if self._client and not self._client.is_closed:
             await self._client.aclose()
 
-    def _update_rate_limit(self, headers: httpx.Headers):
-        remaining = headers.get("x-ratelimit-remaining")
-        reset = headers.get("x-ratelimit-reset")
-        if remaining is not None:
-            self._rate_remaining = int(remaining)
-        if reset is not None:
-            self._rate_reset = float(reset)
-        if self._rate_remaining < 100:
-            logger.warning("GitHub rate limit low: %d remaining", self._rate_remaining)
-
-    async def _wait_for_rate_limit(self):
-        if self._rate_remaining <= 1:
-            wait_seconds = max(self._rate_reset - time.time(), 1)
-            if wait_seconds > 0:
-                logger.warning("Rate limited. Sleeping %.0f seconds", wait_seconds)
-                await asyncio.sleep(min(wait_seconds, 60))
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float | None:
+        retry_after = response.headers.get("retry-after")
+        if retry_after is not None:
+            try:
+                return float(retry_after)
+            except ValueError:
+                return 60.0
+        if response.status_code == 429 or "secondary rate limit" in response.text.lower():
+            return 60.0
+        return None
 
     async def request(
         self,
@@ -62,28 +84,98 @@ class GitHubClient:
         url: str,
         params: dict[str, Any] | None = None,
         retries: int | None = None,
+        json: Any = None,
+    ) -> httpx.Response:
+        if method != "GET":
+            return await self._request(method, url, params, retries, json)
+
+        key = (url, tuple(sorted((k, str(v)) for k, v in (params or {}).items())))
+        return await self._inflight.do(
+            key, lambda: self._request(method, url, params, retries, json)
+        )
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        params: dict[str, Any] | None = None,
+        retries: int | None = None,
+        json: Any = None,
     ) -> httpx.Response:
         retries = retries or settings.github_max_retries
         client = await self._get_client()
 
-        for attempt in range(retries + 1):
-            await self._wait_for_rate_limit()
+        resource = resource_for_path(url)
+        cache_key = None
+        cached = None
+        conditional_headers: dict[str, str] = {}
+        if (
+            method == "GET"
+            and settings.github_conditional_requests
+            and not settings.github_record_dir
+            and resource != "search"
+            and "since" not in (params or {})
+        ):
+            cache_key = self._response_store.make_key(url, params)
 
+        for attempt in range(retries + 1):
             try:
-                response = await client.request(method, url, params=params)
-                self._update_rate_limit(response.headers)
+                async with self._scheduler.slot(resource) as token:
+                    if cache_key is not None and attempt == 0:
+                        cached = await self._response_store.get(cache_key)
+                        if cached is not None:
+                            if cached.etag:
+                                conditional_headers["If-None-Match"] = cached.etag
+                            if cached.last_modified:
+                                conditional_headers["If-Modified-Since"] = cached.last_modified
+                    started = time.perf_counter()
+                    response = await client.request(
+                        method,
+                        url,
+                        params=params,
+                        json=json,
+                        headers={**token.auth_headers, **conditional_headers},
+                    )
+                self._scheduler.observe(token, resource, response.headers)
+                record_request(
+                    url,
+                    response.status_code,
+                    len(response.content),
+                    (time.perf_counter() - started) * 1000,
+                )
 
                 if response.status_code == 200:
+                    await self._scheduler.on_success()
+                    if cache_key is not None:
+                        await self._store_response(cache_key, url, response)
                     return response
                 elif response.status_code == 304:
+                    await self._scheduler.on_success()
+                    if cached is not None:
+                        self._response_store.hits += 1
+                        max_age = timedelta(days=settings.github_cache_max_age_days)
+                        if cached.fetched_at < datetime.now(timezone.utc) - max_age / 2:
+                            await self._response_store.touch(cache_key)
+                        return self._response_from_cache(cached, response)
                     return response
-                elif response.status_code == 403:
-                    if self._rate_remaining <= 0:
+                elif response.status_code in (403, 429):
+                    if response.headers.get("x-ratelimit-remaining") == "0":
+                        reset = response.headers.get("x-ratelimit-reset")
+                        self._scheduler.exhaust(token, resource, float(reset) if reset else None)
+                        if attempt < retries and self._scheduler.pool.choose(resource) is not token:
+                            continue
+                        raise RateLimitExceededError(reset or "")
+                    retry_after = self._retry_after(response)
+                    if retry_after is not None:
+                        self._scheduler.on_throttled(token, retry_after)
+                        if attempt < retries:
+                            continue
                         raise RateLimitExceededError()
                     raise GitHubAPIError(f"Forbidden: {response.text}", 403)
                 elif response.status_code == 404:
                     raise GitHubAPIError(f"Not found: {url}", 404)
                 elif response.status_code >= 500:
+                    self._scheduler.on_error()
                     if attempt < retries:
                         delay = settings.github_retry_delay * (2 ** attempt)
                         logger.warning(
@@ -99,6 +191,7 @@ class GitHubClient:
                         response.status_code,
                     )
             except httpx.RequestError as e:
+                self._scheduler.on_error()
                 if attempt < retries:
                     delay = settings.github_retry_delay * (2 ** attempt)
                     logger.warning("Request error (attempt %d/%d): %s", attempt + 1, retries, e)
@@ -108,39 +201,115 @@ class GitHubClient:
 
         raise GitHubAPIError("Max retries exceeded")
 
+    async def _store_response(self, cache_key: str, url: str, response: httpx.Response):
+        etag = response.headers.get("etag")
+        last_modified = response.headers.get("last-modified")
+        if not etag and not last_modified:
+            return
+        self._response_store.misses += 1
+        await self._response_store.put(
+            cache_key,
+            url,
+            body=response.content,
+            etag=etag,
+            last_modified=last_modified,
+            link=response.headers.get("link"),
+        )
+
+    @staticmethod
+    def _response_from_cache(cached, not_modified: httpx.Response) -> httpx.Response:
+        headers = {
+            k: v for k, v in not_modified.headers.items()
+            if k.lower().startswith("x-ratelimit-")
+        }
+        headers["content-type"] = "application/json; charset=utf-8"
+        if cached.etag:
+            headers["etag"] = cached.etag
+        if cached.link:
+            headers["link"] = cached.link
+        return httpx.Response(
+            200,
+            headers=headers,
+            content=cached.body,
+            request=not_modified.request,
+        )
+
     async def get(self, url: str, params: dict[str, Any] | None = None) -> Any:
         response = await self.request("GET", url, params=params)
         if response.status_code == 304:
             return None
-        return response.json()
+        return decode_json(response.content)
 
-    async def get_paginated(
+    @staticmethod
+    def _last_page(link_header: str) -> int | None:
+        match = _LAST_PAGE_RE.search(link_header or "")
+        return int(match.group(1)) if match else None
+
+    async def _fetch_page(
+        self,
+        url: str,
+        params: dict[str, Any],
+        page: int,
+    ) -> tuple[int, list[Any]]:
+        response = await self.request("GET", url, params={**params, "page": page})
+        return page, decode_json(response.content) or []
+
+    async def iter_pages(
         self,
         url: str,
         params: dict[str, Any] | None = None,
         max_pages: int = 5,
-    ) -> list[Any]:
+    ) -> AsyncIterator[tuple[int, list[Any]]]:
         params = dict(params or {})
         params.setdefault("per_page", 100)
 
-        all_items: list[Any] = []
-        for page in range(1, max_pages + 1):
-            params["page"] = page
-            response = await self.request("GET", url, params=params)
-            items = response.json()
-            if not items:
-                break
-            all_items.extend(items)
-
-            link_header = response.headers.get("link", "")
-            if 'rel="next"' not in link_header:
-                break
-
-        return all_items
+        response = await self.request("GET", url, params={**params, "page": 1})
+        items = decode_json(response.content)
+        if not items:
+            return
+        yield 1, items
+
+        link_header = response.headers.get("link", "")
+        last_page = self._last_page(link_header)
+        if last_page is None:
+            page = 1
+            while 'rel="next"' in link_header and page < max_pages:
+                page += 1
+                response = await self.request("GET", url, params={**params, "page": page})
+                items = decode_json(response.content)
+                if not items:
+                    return
+                yield page, items
+                link_header = response.headers.get("link", "")
+            return
+
+        tasks = [
+            asyncio.create_task(self._fetch_page(url, params, page))
+            for page in range(2, min(last_page, max_pages) + 1)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                page, items = await next_done
+                if items:
+                    yield page, items
+        finally:
+            for task in tasks:
+                task.cancel()
 
+    async def get_paginated(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        max_pages: int = 5,
+        parse: Callable[[dict], Any] | None = None,
+    ) -> list[Any]:
+        pages: dict[int, list[Any]] = {}
+        async for page, items in self.iter_pages(url, params, max_pages=max_pages):
+            pages[page] = [parse(item) for item in items] if parse else items
+        return [item for page in sorted(pages) for item in pages[page]]
 
-    async def get_repo(self, owner: str, repo: str) -> dict:
-        return await self.get(f"/repos/{owner}/{repo}")
+    async def get_repo(self, owner: str, repo: str) -> RepoRecord:
+        return RepoRecord.from_api(await self.get(f"/repos/{owner}/{repo}"))
 
     async def get_repo_languages(self, owner: str, repo: str) -> dict:
         return await self.get(f"/repos/{owner}/{repo}/languages")
@@ -152,11 +321,16 @@ class GitHubClient:
         labels: str = "good first issue",
         state: str = "open",
         max_pages: int = 3,
-    ) -> list[dict]:
+        since: datetime | None = None,
+    ) -> list[IssueRecord]:
+        params = {"labels": labels, "state": state, "per_page": 100}
+        if since is not None:
+            params["since"] = since.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
         return await self.get_paginated(
             f"/repos/{owner}/{repo}/issues",
-            params={"labels": labels, "state": state, "per_page": 100},
+            params=params,
             max_pages=max_pages,
+            parse=IssueRecord.from_api,
         )
 
     async def get_repo_pulls(
@@ -165,13 +339,24 @@ class GitHubClient:
         repo: str,
         state: str = "all",
         max_pages: int = 3,
-    ) -> list[dict]:
+        per_page: int = 100,
+    ) -> list[PullRecord]:
         return await self.get_paginated(
             f"/repos/{owner}/{repo}/pulls",
-            params={"state": state, "sort": "updated", "per_page": 100},
+            params={"state": state, "sort": "updated", "per_page": per_page},
             max_pages=max_pages,
+            parse=PullRecord.from_api,
         )
 
+    async def get_repo_pull_counts(self, owner: str, repo: str, since: date) -> dict[str, int]:
+        queries = _pull_count_queries(owner, repo, since)
+        var_defs = ", ".join(f"${alias}: String!" for alias in queries)
+        selections = "\n".join(
+            f"  {alias}: search(type: ISSUE, query: ${alias}) {{ issueCount }}" for alias in queries
+        )
+        data = await self.graphql(f"query({var_defs}) {{\n{selections}\n}}", queries)
+        return {alias: (data.get(alias) or {}).get("issueCount", 0) for alias in queries}
+
     async def get_contributor_count(self, owner: str, repo: str) -> int:
         try:
             response = await self.request(
@@ -179,13 +364,10 @@ class GitHubClient:
                 f"/repos/{owner}/{repo}/contributors",
                 params={"per_page": 1, "anon": "true"},
             )
-            link = response.headers.get("link", "")
-            if 'rel="last"' in link:
-                import re
-                match = re.search(r'page=(\d+)>; rel="last"', link)
-                if match:
-                    return int(match.group(1))
-            return len(response.json())
+            last_page = self._last_page(response.headers.get("link", ""))
+            if last_page is not None:
+                return last_page
+            return len(decode_json(response.content) or [])
         except Exception:
             return 0
 
@@ -203,7 +385,7 @@ class GitHubClient:
         per_page: int = 100,
         page: int = 1,
     ) -> dict:
-        return await self.get(
+        result = await self.get(
             "/search/repositories",
             params={
                 "q": query,
@@ -212,11 +394,230 @@ class GitHubClient:
                 "per_page": per_page,
                 "page": page,
             },
+        ) or {}
+        return {
+            "total_count": result.get("total_count", 0),
+            "incomplete_results": result.get("incomplete_results", False),
+            "items": [RepoRecord.from_api(item) for item in result.get("items", [])],
+        }
+
+    async def graphql(self, query: str, variables: dict[str, Any] | None = None) -> dict:
+        response = await self.request(
+            "POST",
+            "/graphql",
+            json={"query": query, "variables": variables or {}},
         )
+        payload = decode_json(response.content)
+        if payload.get("data") is None:
+            errors = payload.get("errors") or []
+            message = errors[0].get("message") if errors else "empty response"
+            raise GitHubAPIError(f"GraphQL error: {message}")
+        for error in payload.get("errors") or []:
+            logger.warning("GraphQL partial error: %s", error.get("message"))
+        return payload["data"]
+
+    async def get_repo_details_batch(
+        self,
+        full_names: list[str],
+        labels: str = "good first issue",
+        pr_counts_since: date | None = None,
+    ) -> dict[str, dict]:
+        if not full_names:
+            return {}
+
+        var_defs = ["$labels: [String!]"]
+        selections = []
+        variables: dict[str, Any] = {"labels": [labels]}
+        for i, full_name in enumerate(full_names):
+            owner, name = full_name.split("/", 1)
+            var_defs.append(f"$o{i}: String!, $n{i}: String!")
+            selections.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{ ...RepoDetails }}")
+            variables[f"o{i}"] = owner
+            variables[f"n{i}"] = name
+            if pr_counts_since is not None:
+                for alias, search in _pull_count_queries(owner, name, pr_counts_since).items():
+                    var_defs.append(f"$r{i}_{alias}: String!")
+                    selections.append(
+                        f"r{i}_{alias}: search(type: ISSUE, query: $r{i}_{alias}) {{ issueCount }}"
+                    )
+                    variables[f"r{i}_{alias}"] = search
+
+        query = (
+            f"query({', '.join(var_defs)}) {{\n"
+            + "\n".join(selections)
+            + "\n}\n"
+            + _REPO_DETAILS_FRAGMENT
+        )
+        data = await self.graphql(query, variables)
+
+        details: dict[str, dict] = {}
+        for i, full_name in enumerate(full_names):
+            node = data.get(f"r{i}")
+            if node is None:
+                continue
+            details[full_name] = _graphql_repo_to_details(node)
+            if pr_counts_since is not None:
+                details[full_name]["pr_counts"] = {
+                    alias: (data.get(f"r{i}_{alias}") or {}).get("issueCount", 0)
+                    for alias in _PULL_COUNT_ALIASES
+                }
+        return details
+
+    async def prune_response_cache(self) -> int:
+        return await self._response_store.prune(timedelta(days=settings.github_cache_max_age_days))
+
+    async def refresh_rate_limits(self):
+        client = await self._get_client()
+        now = time.time()
+        for token in self._scheduler.pool.tokens:
+            if token.budget("core").reset > now:
+                continue
+            try:
+                response = await client.get("/rate_limit", headers=token.auth_headers)
+                response.raise_for_status()
+            except httpx.HTTPError as e:
+                logger.warning("Could not read rate limits for token %s: %s", token.label, e)
+                continue
+            resources = (decode_json(response.content) or {}).get("resources") or {}
+            for resource, values in resources.items():
+                token.budget(resource).set(values["limit"], values["remaining"], float(values["reset"]))
 
     @property
     def rate_remaining(self) -> int:
-        return self._rate_remaining
+        return self._scheduler.remaining("core")
+
+    @property
+    def rate_limit(self) -> int:
+        return sum(t.budget("core").limit for t in self._scheduler.pool.tokens)
+
+    @property
+    def rate_reset_at(self) -> float | None:
+        return self._scheduler.pool.reset_at("core")
+
+    @property
+    def total_requests(self) -> int:
+        return sum(t.requests for t in self._scheduler.pool.tokens)
+
+    @property
+    def scheduler_stats(self) -> dict:
+        return {
+            **self._scheduler.stats(),
+            "coalesced_requests": self._inflight.coalesced,
+        }
+
+    @property
+    def conditional_cache_stats(self) -> dict[str, int]:
+        return {
+            "revalidated": self._response_store.hits,
+            "refreshed": self._response_store.misses,
+        }
+
+
+_PULL_COUNT_ALIASES = ("merged", "closed", "open", "merged_30d", "closed_30d")
+
+
+def _pull_count_queries(owner: str, repo: str, since: date) -> dict[str, str]:
+    base = f"repo:{owner}/{repo} is:pr"
+    day = since.isoformat()
+    return dict(zip(_PULL_COUNT_ALIASES, (
+        f"{base} is:merged",
+        f"{base} is:closed is:unmerged",
+        f"{base} is:open",
+        f"{base} is:merged merged:>={day}",
+        f"{base} is:closed is:unmerged closed:>={day}",
+    )))
+
+
+_REPO_DETAILS_FRAGMENT = """
+fragment RepoDetails on Repository {
+  licenseInfo { spdxId }
+  languages(first: 20, orderBy: {field: SIZE, direction: DESC}) {
+    edges { size node { name } }
+  }
+  issues(first: 100, states: OPEN, labels: $labels, orderBy: {field: UPDATED_AT, direction: DESC}) {
+    nodes {
+      databaseId title body url state createdAt updatedAt closedAt
+      comments { totalCount }
+      labels(first: 10) { nodes { name } }
+      assignees(first: 1) { nodes { login } }
+    }
+  }
+  pullRequests(first: 100, orderBy: {field: UPDATED_AT, direction: DESC}) {
+    nodes { state createdAt mergedAt closedAt }
+  }
+  contributingGuidelines { url }
+  codeOfConduct { key }
+  rootFiles: object(expression: "HEAD:") { ...FileNames }
+  docsFiles: object(expression: "HEAD:docs") { ...FileNames }
+  githubFiles: object(expression: "HEAD:.github") { ...FileNames }
+  issueTemplates { name }
+  pullRequestTemplates { filename }
+}
+
+fragment FileNames on GitObject {
+  ... on Tree { entries { name } }
+}
+"""
+
+
+def _find_readme(node: dict) -> dict | None:
+    for key in ("rootFiles", "githubFiles", "docsFiles"):
+        for entry in (node.get(key) or {}).get("entries") or []:
+            if entry["name"].lower().startswith("readme"):
+                return {"name": entry["name"]}
+    return None
+
+
+def _graphql_repo_to_details(node: dict) -> dict:
+    languages = {
+        edge["node"]["name"]: edge["size"]
+        for edge in (node.get("languages") or {}).get("edges", [])
+    }
+
+    issues = []
+    for issue in (node.get("issues") or {}).get("nodes", []):
+        assignees = issue["assignees"]["nodes"]
+        issues.append(IssueRecord.from_api({
+            "id": issue["databaseId"],
+            "title": issue["title"],
+            "body": issue.get("body"),
+            "html_url": issue["url"],
+            "state": issue["state"].lower(),
+            "labels": issue["labels"]["nodes"],
+            "comments": issue["comments"]["totalCount"],
+            "assignee": assignees[0] if assignees else None,
+            "created_at": issue["createdAt"],
+            "updated_at": issue["updatedAt"],
+            "closed_at": issue["closedAt"],
+        }))
+
+    pulls = [
+        PullRecord.from_api({
+            "state": "open" if pr["state"] == "OPEN" else "closed",
+            "created_at": pr["createdAt"],
+            "merged_at": pr["mergedAt"],
+            "closed_at": pr["closedAt"],
+        })
+        for pr in (node.get("pullRequests") or {}).get("nodes", [])
+    ]
+
+    community = {
+        "files": {
+            "contributing": node.get("contributingGuidelines"),
+            "code_of_conduct": node.get("codeOfConduct"),
+            "readme": _find_readme(node),
+            "issue_template": node.get("issueTemplates") or None,
+            "pull_request_template": node.get("pullRequestTemplates") or None,
+            "license": node.get("licenseInfo"),
+        }
+    }
+
+    return {
+        "languages": languages,
+        "issues": issues,
+        "pulls": pulls,
+        "community": community,
+    }
 
 
 github_client = GitHubClient()
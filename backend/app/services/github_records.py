@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any
+
+import orjson
+
+ISSUE_BODY_LIMIT = 1000
+
+
+def decode_json(content: bytes) -> Any:
+    if not content:
+        return None
+    return orjson.loads(content)
+
+
+def parse_timestamp(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except (ValueError, TypeError):
+        return None
+
+
+def format_timestamp(value: datetime | None) -> str | None:
+    return value.isoformat() if value else None
+
+
+@dataclass(slots=True)
+class RepoRecord:
+    id: int
+    full_name: str
+    description: str | None = None
+    language: str | None = None
+    stargazers_count: int = 0
+    forks_count: int = 0
+    open_issues_count: int = 0
+    watchers_count: int = 0
+    license_spdx: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    pushed_at: datetime | None = None
+    archived: bool = False
+    topics: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_api(cls, data: dict) -> RepoRecord:
+        license_info = data.get("license")
+        return cls(
+            id=data["id"],
+            full_name=data["full_name"],
+            description=data.get("description"),
+            language=data.get("language"),
+            stargazers_count=data.get("stargazers_count", 0),
+            forks_count=data.get("forks_count", 0),
+            open_issues_count=data.get("open_issues_count", 0),
+            watchers_count=data.get("watchers_count", 0),
+            license_spdx=license_info.get("spdx_id") if license_info else None,
+            created_at=parse_timestamp(data.get("created_at")),
+            updated_at=parse_timestamp(data.get("updated_at")),
+            pushed_at=parse_timestamp(data.get("pushed_at")),
+            archived=data.get("archived", False),
+            topics=data.get("topics", []),
+        )
+
+    def to_api(self) -> dict:
+        return {
+            "id": self.id,
+            "full_name": self.full_name,
+            "description": self.description,
+            "language": self.language,
+            "stargazers_count": self.stargazers_count,
+            "forks_count": self.forks_count,
+            "open_issues_count": self.open_issues_count,
+            "watchers_count": self.watchers_count,
+            "license": {"spdx_id": self.license_spdx} if self.license_spdx else None,
+            "created_at": format_timestamp(self.created_at),
+            "updated_at": format_timestamp(self.updated_at),
+            "pushed_at": format_timestamp(self.pushed_at),
+            "archived": self.archived,
+            "topics": self.topics,
+        }
+
+
+@dataclass(slots=True)
+class IssueRecord:
+    id: int
+    title: str
+    body: str | None = None
+    html_url: str | None = None
+    state: str = "open"
+    labels: list[str] = field(default_factory=list)
+    comments: int = 0
+    assignee_login: str | None = None
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
+    closed_at: datetime | None = None
+
+    @classmethod
+    def from_api(cls, data: dict) -> IssueRecord:
+        assignee = data.get("assignee")
+        return cls(
+            id=data["id"],
+            title=data["title"],
+            body=(data.get("body") or "")[:ISSUE_BODY_LIMIT] or None,
+            html_url=data.get("html_url"),
+            state=data.get("state", "open"),
+            labels=[l["name"] for l in data.get("labels", [])],
+            comments=data.get("comments", 0),
+            assignee_login=assignee["login"] if assignee else None,
+            created_at=parse_timestamp(data.get("created_at")),
+            updated_at=parse_timestamp(data.get("updated_at")),
+            closed_at=parse_timestamp(data.get("closed_at")),
+        )
+
+    def to_api(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "body": self.body,
+            "html_url": self.html_url,
+            "state": self.state,
+            "labels": [{"name": label} for label in self.labels],
+            "comments": self.comments,
+            "assignee": {"login": self.assignee_login} if self.assignee_login else None,
+            "created_at": format_timestamp(self.created_at),
+            "updated_at": format_timestamp(self.updated_at),
+            "closed_at": format_timestamp(self.closed_at),
+        }
+
+
+@dataclass(slots=True)
+class PullRecord:
+    state: str
+    created_at: datetime | None = None
+    merged_at: datetime | None = None
+    closed_at: datetime | None = None
+
+    @classmethod
+    def from_api(cls, data: dict) -> PullRecord:
+        return cls(
+            state=data.get("state", "open"),
+            created_at=parse_timestamp(data.get("created_at")),
+            merged_at=parse_timestamp(data.get("merged_at")),
+            closed_at=parse_timestamp(data.get("closed_at")),
+        )
+
+    def to_api(self) -> dict:
+        return {
+            "state": self.state,
+            "created_at": format_timestamp(self.created_at),
+            "merged_at": format_timestamp(self.merged_at),
+            "closed_at": format_timestamp(self.closed_at),
+        }
@@ -1,415 +1,1514 @@
 
 from __future__ import annotations
 
+import asyncio
+import heapq
 import logging
-from datetime import datetime, timezone
-
-from sqlalchemy import select
+import os
+import socket
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from dataclasses import dataclass, field, replace
+from datetime import date, datetime, timedelta, timezone
+from typing import AsyncIterable, AsyncIterator, Callable, Container, Iterable
+
+from sqlalchemy import delete, or_, select, update
 from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
+from app.core.singleflight import KeyedLock, SingleFlight
 from app.database import async_session_factory
 from app.models.issue import Issue
 from app.models.language import RepoLanguage
 from app.models.metrics_history import RepoMetricsHistory
 from app.models.repository import Repository
 from app.services.github_client import github_client
+from app.services.github_records import IssueRecord, RepoRecord
+from app.services.api_costs import charge_repos, cost_scope
+from app.services.payload_store import compress_payload, project_payload, save_payload
+from app.services.refresh_planner import (
+    PINNED_PRIORITY,
+    load_cost_model,
+    request_budget,
+    select_due_repos,
+    update_refresh_plans,
+)
 from app.services.scoring_engine import (
     calculate_activity_score,
     calculate_beginner_friendliness_score,
     calculate_combined_score,
     estimate_issue_difficulty,
 )
+from app.services.search_partitions import (
+    SEARCH_PAGE_SIZE,
+    SEARCH_RESULT_CAP,
+    SearchFrontier,
+    SearchPartition,
+    discovery_partitions,
+)
+from app.services.sync_pipeline import start_pipeline
+from app.services.sync_runs import (
+    add_run_items,
+    claim_items,
+    done_github_ids,
+    finish_run,
+    has_open_items,
+    last_started_run_at,
+    mark_items_done,
+    mark_items_failed,
+    renew_claims,
+    start_or_resume_run,
+)
 
 logger = logging.getLogger(__name__)
 
-POPULAR_QUERIES = [
-    "good-first-issues:>3 stars:>500 pushed:>{recent_date} archived:false language:Python",
-    "good-first-issues:>3 stars:>500 pushed:>{recent_date} archived:false language:JavaScript",
-    "good-first-issues:>3 stars:>500 pushed:>{recent_date} archived:false language:TypeScript",
-    "good-first-issues:>3 stars:>500 pushed:>{recent_date} archived:false language:Java",
-    "good-first-issues:>3 stars:>500 pushed:>{recent_date} archived:false language:Go",
-    "good-first-issues:>3 stars:>500 pushed:>{recent_date} archived:false language:Rust",
-    "good-first-issues:>3 stars:>500 pushed:>{recent_date} archived:false language:C++",
-    "good-first-issues:>3 stars:>500 pushed:>{recent_date} archived:false language:Ruby",
-    "good-first-issues:>3 stars:>500 pushed:>{recent_date} archived:false language:PHP",
-    "good-first-issues:>3 stars:>500 pushed:>{recent_date} archived:false language:C#",
-]
-
-BEGINNER_QUERIES = [
-    "good-first-issues:>1 stars:100..500 pushed:>{recent_date} archived:false language:Python",
-    "good-first-issues:>1 stars:100..500 pushed:>{recent_date} archived:false language:JavaScript",
-    "good-first-issues:>1 stars:100..500 pushed:>{recent_date} archived:false language:TypeScript",
-    "good-first-issues:>1 stars:100..500 pushed:>{recent_date} archived:false language:Java",
-    "good-first-issues:>1 stars:100..500 pushed:>{recent_date} archived:false language:Go",
-    "good-first-issues:>1 stars:100..500 pushed:>{recent_date} archived:false language:Rust",
-    "good-first-issues:>1 stars:100..500 pushed:>{recent_date} archived:false language:C++",
-    "good-first-issues:>1 stars:100..500 pushed:>{recent_date} archived:false language:Ruby",
-    "good-first-issues:>1 stars:100..500 pushed:>{recent_date} archived:false language:PHP",
-    "good-first-issues:>1 stars:100..500 pushed:>{recent_date} archived:false language:C#",
-]
-
-DISCOVERY_QUERIES = POPULAR_QUERIES + BEGINNER_QUERIES
-
-
-def _parse_datetime(dt_str: str | None) -> datetime | None:
-    if not dt_str:
-        return None
-    try:
-        return datetime.fromisoformat(dt_str.replace("Z", "+00:00"))
-    except (ValueError, TypeError):
-        return None
+_repo_sync_flights = SingleFlight()
+_repo_sync_locks = KeyedLock()
+_sync_lock = asyncio.Lock()
 
 
-async def discover_repositories(max_pages_per_query: int = 3) -> list[dict]:
-    from datetime import timedelta
+def sync_today() -> date:
+    return settings.sync_today or datetime.now(timezone.utc).date()
 
-    recent_date = (datetime.now(timezone.utc) - timedelta(days=60)).strftime("%Y-%m-%d")
-    all_repos: dict[str, dict] = {}
 
-    for query_template in DISCOVERY_QUERIES:
-        query = query_template.format(recent_date=recent_date)
-        logger.info("Searching: %s", query)
+def _is_leaf(partition: SearchPartition, total: int) -> bool:
+    return total <= SEARCH_RESULT_CAP or not partition.split()
 
-        for page in range(1, max_pages_per_query + 1):
-            try:
-                result = await github_client.search_repositories(
-                    query=query, sort="updated", order="desc", per_page=100, page=page
-                )
-                items = result.get("items", [])
-                if not items:
-                    break
 
-                for item in items:
-                    full_name = item["full_name"]
-                    if full_name not in all_repos:
-                        all_repos[full_name] = item
+@dataclass(slots=True)
+class _DiscoverySearch:
+    max_pages: int | None
+    limiter: asyncio.Semaphore
+    out: asyncio.Queue
+    exhausted: Callable[[SearchPartition], bool]
+    frontier: SearchFrontier
+    stats: dict[str, int] = field(
+        default_factory=lambda: {"calls": 0, "splits": 0, "leaves": 0, "pruned": 0}
+    )
 
-                logger.info(
-                    "  Page %d: %d repos (total unique: %d)",
-                    page, len(items), len(all_repos),
-                )
 
-                if len(items) < 100:
-                    break
-            except Exception as e:
-                logger.error("Search error (page %d): %s", page, e)
+async def _search_page(
+    search: _DiscoverySearch,
+    partition: SearchPartition,
+    key: int,
+    page: int,
+) -> tuple[int, int | None] | None:
+    async with search.limiter:
+        try:
+            result = await github_client.search_repositories(
+                query=partition.render(), sort="stars", order="desc",
+                per_page=SEARCH_PAGE_SIZE, page=page,
+            )
+        except Exception as e:
+            logger.error("Search error for %s (page %d): %s", partition.render(), page, e)
+            return None
+        search.stats["calls"] += 1
+        items = result["items"]
+        if items and (page > 1 or _is_leaf(partition, result["total_count"])):
+            await search.out.put((key, items))
+        return result["total_count"], items[-1].stargazers_count if items else None
+
+
+async def _search_leaf(
+    search: _DiscoverySearch,
+    partition: SearchPartition,
+    key: int,
+    started: asyncio.Event,
+) -> list[SearchPartition]:
+    if search.exhausted(partition):
+        search.stats["pruned"] += 1
+        return []
+    result = await _search_page(search, partition, key, 1)
+    if result is None:
+        return []
+    total, last_stars = result
+
+    if not _is_leaf(partition, total):
+        search.stats["splits"] += 1
+        logger.debug("Splitting %s (%d results)", partition.render(), total)
+        return partition.split()
+    started.set()
+    if total > SEARCH_RESULT_CAP:
+        logger.warning("Search partition still truncated at %d results: %s", total, partition.render())
+
+    logger.info("Searching: %s (%d results)", partition.render(), total)
+    search.stats["leaves"] += 1
+    pages = partition.pages_needed(total)
+    if search.max_pages is not None:
+        pages = min(pages, search.max_pages)
+    for page in range(2, pages + 1):
+        if last_stars is None:
+            break
+        if search.exhausted(replace(partition, stars_max=last_stars)):
+            search.stats["pruned"] += 1
+            break
+        result = await _search_page(search, partition, key, page)
+        if result is None:
+            break
+        _, last_stars = result
+    return []
+
+
+async def _search_partition(
+    search: _DiscoverySearch,
+    partition: SearchPartition,
+    key: int,
+    started: asyncio.Event | None = None,
+):
+    started = started or asyncio.Event()
+    try:
+        parts = [(part, search.frontier.open(part)) for part in await _search_leaf(search, partition, key, started)]
+        await search.out.put((key, None))
+        if not parts:
+            return
+        (lower, lower_key), (upper, upper_key) = parts
+        if upper.stars_min == lower.stars_min:
+            await asyncio.gather(
+                _search_partition(search, lower, lower_key, started),
+                _search_partition(search, upper, upper_key, started),
+            )
+            return
+        upper_started = asyncio.Event()
+        upper_search = asyncio.ensure_future(_search_partition(search, upper, upper_key, upper_started))
+        try:
+            await upper_started.wait()
+            started.set()
+            await asyncio.gather(upper_search, _search_partition(search, lower, lower_key))
+        finally:
+            upper_search.cancel()
+    finally:
+        started.set()
+
+
+async def _iter_search_pages(
+    max_pages_per_query: int | None,
+    exhausted: Callable[[SearchPartition], bool],
+    frontier: SearchFrontier,
+) -> AsyncIterator[tuple[int, list[RepoRecord] | None]]:
+    partitions = discovery_partitions(
+        settings.discovery_language_list, sync_today()
+    )
+    search = _DiscoverySearch(
+        max_pages=max_pages_per_query,
+        limiter=asyncio.Semaphore(settings.discovery_concurrency),
+        out=asyncio.Queue(maxsize=settings.discovery_concurrency),
+        exhausted=exhausted,
+        frontier=frontier,
+    )
+    keys = [frontier.open(p) for p in partitions]
+
+    async def run_all():
+        try:
+            await asyncio.gather(*(
+                _search_partition(search, p, key) for p, key in zip(partitions, keys)
+            ))
+        except Exception as e:
+            logger.error("Discovery failed: %s", e)
+        await search.out.put(None)
+
+    runner = asyncio.create_task(run_all())
+    found = 0
+    try:
+        while True:
+            message = await search.out.get()
+            if message is None:
                 break
+            found += len(message[1] or ())
+            yield message
+    finally:
+        runner.cancel()
+        stats = search.stats
+        logger.info(
+            "Discovery complete: %d repos found with %d search calls "
+            "(%d partitions, %d splits, %d pruned)",
+            found, stats["calls"], stats["leaves"], stats["splits"], stats["pruned"],
+        )
+
 
-    logger.info("Discovery complete: %d unique repos found", len(all_repos))
-    return list(all_repos.values())
+async def iter_discovered_repositories(max_pages_per_query: int | None = None) -> AsyncIterator[RepoRecord]:
+    pages = _iter_search_pages(max_pages_per_query, lambda partition: False, SearchFrontier())
+    async with aclosing(pages):
+        async for _, items in pages:
+            for item in items or ():
+                yield item
+
+
+async def iter_selected_repositories(
+    bands: CandidateBands,
+    max_pages_per_query: int | None = None,
+) -> AsyncIterator[list[RepoRecord]]:
+    frontier = SearchFrontier()
+    pages = _iter_search_pages(max_pages_per_query, bands.exhausted, frontier)
+    async with aclosing(pages):
+        async for key, items in pages:
+            if items is None:
+                frontier.close(key)
+            else:
+                for item in items:
+                    bands.push(item)
+                frontier.lower(key, items[-1].stargazers_count)
+            if released := bands.release(frontier):
+                yield released
+    if released := bands.release():
+        yield released
+
+
+class TopRepos:
+
+    def __init__(self, limit: int):
+        self.limit = max(limit, 0)
+        self._heap: list[tuple[int, int, RepoRecord]] = []
+        self._ids: set[int] = set()
+
+    def push(self, repo_data: RepoRecord):
+        if repo_data.id in self._ids:
+            return
+        entry = (repo_data.stargazers_count, repo_data.id, repo_data)
+        if len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif self._heap and entry[:2] > self._heap[0][:2]:
+            evicted = heapq.heapreplace(self._heap, entry)
+            self._ids.discard(evicted[1])
+        else:
+            return
+        self._ids.add(repo_data.id)
+
+    def excludes(self, stars: int) -> bool:
+        return len(self._heap) >= self.limit and (not self._heap or stars < self._heap[0][0])
+
+    def ranked(self) -> list[RepoRecord]:
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
+
+class CandidateBands:
+
+    ranges = {"popular": (501, None), "small": (0, 500)}
+
+    def __init__(self, popular_limit: int, small_limit: int, skip: Container[str] = ()):
+        self.tops = {"popular": TopRepos(popular_limit), "small": TopRepos(small_limit)}
+        self.skip = skip
+        self.seen = 0
+        self._released: set[int] = set()
+
+    @staticmethod
+    def band(stars: int) -> str:
+        return "popular" if stars > 500 else "small"
+
+    def push(self, repo_data: RepoRecord):
+        self.seen += 1
+        if str(repo_data.id) not in self.skip:
+            self.tops[self.band(repo_data.stargazers_count)].push(repo_data)
+
+    def exhausted(self, partition: SearchPartition) -> bool:
+        if partition.stars_max is None:
+            return False
+        bands = {self.band(partition.stars_min), self.band(partition.stars_max)}
+        return all(self.tops[band].excludes(partition.stars_max) for band in bands)
+
+    def release(self, frontier: SearchFrontier | None = None) -> list[RepoRecord]:
+        released = []
+        for band, top in self.tops.items():
+            ceiling = frontier.highest(*self.ranges[band]) if frontier is not None else -1
+            for repo_data in top.ranked():
+                if repo_data.stargazers_count <= ceiling:
+                    break
+                if repo_data.id not in self._released:
+                    self._released.add(repo_data.id)
+                    released.append(repo_data)
+        return released
+
+
+ISSUE_PAGES = 3
+ISSUE_UPSERT_CHUNK = 1000
+UNTRACKED_REPO_FIELDS = frozenset({"github_id", "synced_at"})
+
+
+@dataclass(slots=True)
+class RepoChangeSet:
+    repo: Repository
+    created: bool = False
+    fields: dict[str, tuple] = field(default_factory=dict)
+    languages: list[str] = field(default_factory=list)
+    issues_updated: list[str] = field(default_factory=list)
+    issues_closed: list[str] = field(default_factory=list)
+
+    @property
+    def changed(self) -> bool:
+        return bool(
+            self.created or self.fields or self.languages
+            or self.issues_updated or self.issues_closed
+        )
 
 
-async def sync_single_repo(session: AsyncSession, repo_data: dict) -> Repository | None:
-    full_name = repo_data["full_name"]
-    owner, name = full_name.split("/", 1)
+def _distinct_from_excluded(table, stmt, columns):
+    return or_(*(table.c[column].is_distinct_from(stmt.excluded[column]) for column in columns))
 
-    try:
-        logger.info("Syncing %s ...", full_name)
 
-        contributor_count = await github_client.get_contributor_count(owner, name)
+def _diff_repo_fields(stored: Repository | None, values: dict) -> dict[str, tuple]:
+    if stored is None:
+        return {}
+    return {
+        key: (getattr(stored, key), value)
+        for key, value in values.items()
+        if key not in UNTRACKED_REPO_FIELDS and getattr(stored, key) != value
+    }
 
-        languages_data = await github_client.get_repo_languages(owner, name)
 
-        gfi_data = await github_client.get_repo_issues(
-            owner, name, labels="good first issue", state="open", max_pages=3
+async def fetch_repo_details(
+    owner: str,
+    name: str,
+    issues_since: datetime | None = None,
+) -> dict:
+    if issues_since is not None:
+        issues_request = github_client.get_repo_issues(
+            owner, name, labels="good first issue", state="all",
+            max_pages=ISSUE_PAGES, since=issues_since,
+        )
+    else:
+        issues_request = github_client.get_repo_issues(
+            owner, name, labels="good first issue", state="open", max_pages=ISSUE_PAGES
         )
 
-        pr_data = await github_client.get_repo_pulls(
-            owner, name, state="all", max_pages=2
+    count_prs = settings.sync_pr_metric_source == "search"
+    if count_prs:
+        pulls_request = github_client.get_repo_pulls(
+            owner, name, state="closed", max_pages=1, per_page=settings.sync_pr_sample_size
         )
+    else:
+        pulls_request = github_client.get_repo_pulls(owner, name, state="all", max_pages=2)
+
+    requests = [
+        github_client.get_contributor_count(owner, name),
+        github_client.get_repo_languages(owner, name),
+        issues_request,
+        pulls_request,
+        github_client.get_community_profile(owner, name),
+    ]
+    if count_prs:
+        since = sync_today() - timedelta(days=30)
+        requests.append(github_client.get_repo_pull_counts(owner, name, since))
+
+    contributor_count, languages_data, gfi_data, pr_data, community, *pr_counts = (
+        await asyncio.gather(*requests)
+    )
 
-        community = await github_client.get_community_profile(owner, name)
-
-        merged_prs = [p for p in pr_data if p.get("merged_at")]
-        closed_prs = [p for p in pr_data if p.get("state") == "closed" and not p.get("merged_at")]
-        open_prs = [p for p in pr_data if p.get("state") == "open"]
-
-        avg_pr_merge_hours = None
-        if merged_prs:
-            merge_times = []
-            for pr in merged_prs:
-                created = _parse_datetime(pr["created_at"])
-                merged = _parse_datetime(pr["merged_at"])
-                if created and merged:
-                    hours = (merged - created).total_seconds() / 3600
-                    merge_times.append(hours)
-            if merge_times:
-                avg_pr_merge_hours = sum(merge_times) / len(merge_times)
-
-        avg_issue_response_hours = None
-        if gfi_data:
-            commented = [i for i in gfi_data if i.get("comments", 0) > 0]
-            if commented:
-                response_times = []
-                for issue in commented[:20]:
-                    created = _parse_datetime(issue["created_at"])
-                    updated = _parse_datetime(issue["updated_at"])
-                    if created and updated and updated > created:
-                        hours = (updated - created).total_seconds() / 3600
-                        response_times.append(min(hours, 720))
-                if response_times:
-                    avg_issue_response_hours = sum(response_times) / len(response_times)
-
-        total_bytes = sum(languages_data.values()) if languages_data else 0
-        language_breakdown = []
-        if total_bytes > 0:
-            for lang, bytes_count in languages_data.items():
-                language_breakdown.append({
-                    "language": lang,
-                    "bytes_count": bytes_count,
-                    "percentage": round((bytes_count / total_bytes) * 100, 1),
-                })
-
-        files = community.get("files", {}) if community else {}
-        has_contributing = files.get("contributing") is not None
-        has_coc = files.get("code_of_conduct") is not None
-        has_readme = files.get("readme") is not None
-        has_issue_template = files.get("issue_template") is not None
-        has_pr_template = files.get("pull_request_template") is not None
-
-        license_info = repo_data.get("license")
-        license_type = license_info.get("spdx_id") if license_info else None
-
-        score_inputs = {
-            "last_commit_at": _parse_datetime(repo_data.get("pushed_at")),
-            "last_pushed_at": _parse_datetime(repo_data.get("pushed_at")),
-            "avg_pr_merge_hours": avg_pr_merge_hours,
-            "avg_issue_response_hours": avg_issue_response_hours,
-            "merged_pr_count": len(merged_prs),
-            "closed_pr_count": len(closed_prs),
-            "open_pr_count": len(open_prs),
-            "contributor_count": contributor_count,
-            "stars": repo_data.get("stargazers_count", 0),
-            "forks": repo_data.get("forks_count", 0),
-            "good_first_issue_count": len(gfi_data),
-            "has_contributing_guide": has_contributing,
-            "has_code_of_conduct": has_coc,
-            "has_readme": has_readme,
-            "has_issue_templates": has_issue_template,
-            "has_pr_templates": has_pr_template,
-            "license_type": license_type,
-        }
-
-        activity = calculate_activity_score(**score_inputs)
-        bf = calculate_beginner_friendliness_score(**score_inputs)
-        combined = calculate_combined_score(activity, bf)
-
-        total_completed_prs = len(merged_prs) + len(closed_prs)
-        pr_merge_rate = len(merged_prs) / total_completed_prs if total_completed_prs > 0 else 0.0
-
-        last_merged_pr_at = None
-        if merged_prs:
-            merge_dates = [_parse_datetime(p["merged_at"]) for p in merged_prs if p.get("merged_at")]
-            if merge_dates:
-                last_merged_pr_at = max(d for d in merge_dates if d is not None)
-
-        from datetime import timedelta
-        thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-        recent_merged_30d = sum(
-            1 for p in merged_prs
-            if _parse_datetime(p.get("merged_at"))
-            and _parse_datetime(p["merged_at"]) > thirty_days_ago
+    return {
+        "contributor_count": contributor_count,
+        "languages": languages_data,
+        "issues": gfi_data,
+        "issues_since": issues_since,
+        "issues_complete": len(gfi_data) < ISSUE_PAGES * 100,
+        "pulls": pr_data,
+        "pr_counts": pr_counts[0] if pr_counts else None,
+        "community": community,
+    }
+
+
+async def fetch_repo_details_batch(full_names: list[str]) -> dict[str, dict]:
+    pr_counts_since = None
+    if settings.sync_pr_metric_source == "search":
+        pr_counts_since = sync_today() - timedelta(days=30)
+    try:
+        batch = await github_client.get_repo_details_batch(full_names, pr_counts_since=pr_counts_since)
+    except Exception as e:
+        logger.error("GraphQL batch fetch failed, falling back to REST: %s", e)
+        return {}
+
+    counts = await asyncio.gather(*(
+        github_client.get_contributor_count(*full_name.split("/", 1)) for full_name in batch
+    ))
+    for details, contributor_count in zip(batch.values(), counts):
+        details["issues_complete"] = len(details["issues"]) < 100
+        details["contributor_count"] = contributor_count
+    return batch
+
+
+async def _record_history(
+    session: AsyncSession,
+    repo_id: int,
+    activity: float,
+    bf: float,
+    stars: int,
+    forks: int,
+    good_first_issue_count: int,
+    avg_pr_merge_hours: float | None,
+):
+    values = {
+        "activity_score": activity,
+        "beginner_friendliness_score": bf,
+        "stars": stars,
+        "forks": forks,
+        "good_first_issue_count": good_first_issue_count,
+        "avg_pr_merge_hours": avg_pr_merge_hours,
+    }
+    history_stmt = pg_insert(RepoMetricsHistory).values(
+        repo_id=repo_id,
+        recorded_date=date.today(),
+        **values,
+    )
+    history_stmt = history_stmt.on_conflict_do_update(
+        constraint="uq_repo_metrics_date",
+        set_=values,
+        where=_distinct_from_excluded(RepoMetricsHistory.__table__, history_stmt, values),
+    )
+    await session.execute(history_stmt)
+
+
+async def _replace_languages(
+    session: AsyncSession,
+    repo_id: int,
+    language_breakdown: list[dict],
+) -> list[str]:
+    removed = await session.execute(
+        delete(RepoLanguage)
+        .where(
+            RepoLanguage.repo_id == repo_id,
+            RepoLanguage.language.not_in([l["language"] for l in language_breakdown]),
         )
+        .returning(RepoLanguage.language)
+    )
+    if not language_breakdown:
+        return list(removed.scalars())
 
-        commit_within_30d = _parse_datetime(repo_data.get("pushed_at")) and \
-            _parse_datetime(repo_data["pushed_at"]) > thirty_days_ago
-        merged_within_30d = last_merged_pr_at and last_merged_pr_at > thirty_days_ago
-        is_actively_merging = all([
-            commit_within_30d,
-            merged_within_30d,
-            pr_merge_rate > 0.5,
-            contributor_count > 5,
-            not repo_data.get("archived", False),
-        ])
-
-        repo_values = {
-            "github_id": str(repo_data["id"]),
-            "full_name": full_name,
-            "owner": owner,
-            "name": name,
-            "description": (repo_data.get("description") or "")[:2000],
-            "primary_language": repo_data.get("language"),
-            "stars": repo_data.get("stargazers_count", 0),
-            "forks": repo_data.get("forks_count", 0),
-            "open_issues_count": repo_data.get("open_issues_count", 0),
-            "watchers": repo_data.get("watchers_count", 0),
-            "license": license_type,
-            "created_at": _parse_datetime(repo_data.get("created_at")),
-            "last_pushed_at": _parse_datetime(repo_data.get("pushed_at")),
-            "last_commit_at": _parse_datetime(repo_data.get("pushed_at")),
-            "activity_score": activity,
-            "beginner_friendliness_score": bf,
-            "combined_score": combined,
-            "good_first_issue_count": len(gfi_data),
-            "contributor_count": contributor_count,
-            "avg_pr_merge_hours": avg_pr_merge_hours,
-            "avg_issue_response_hours": avg_issue_response_hours,
-            "open_pr_count": len(open_prs),
-            "closed_pr_count": len(closed_prs),
-            "merged_pr_count": len(merged_prs),
-            "has_contributing_guide": has_contributing,
-            "has_code_of_conduct": has_coc,
-            "has_readme": has_readme,
-            "has_issue_templates": has_issue_template,
-            "has_pr_templates": has_pr_template,
-            "last_merged_pr_at": last_merged_pr_at,
-            "pr_merge_rate": round(pr_merge_rate, 3),
-            "recent_merged_pr_count_30d": recent_merged_30d,
-            "is_actively_merging": is_actively_merging,
-            "topics": repo_data.get("topics", []),
-            "synced_at": datetime.now(timezone.utc),
-            "is_active": True,
-        }
-
-        stmt = pg_insert(Repository).values(**repo_values)
-        stmt = stmt.on_conflict_do_update(
+    lang_stmt = pg_insert(RepoLanguage).values(
+        [{"repo_id": repo_id, **lang_info} for lang_info in language_breakdown]
+    )
+    lang_stmt = lang_stmt.on_conflict_do_update(
+        constraint="uq_repo_language",
+        set_={
+            "bytes_count": lang_stmt.excluded.bytes_count,
+            "percentage": lang_stmt.excluded.percentage,
+        },
+        where=_distinct_from_excluded(
+            RepoLanguage.__table__, lang_stmt, ("bytes_count", "percentage")
+        ),
+    ).returning(RepoLanguage.language)
+    upserted = await session.execute(lang_stmt)
+    return list(removed.scalars()) + list(upserted.scalars())
+
+
+async def upsert_issues(
+    session: AsyncSession,
+    repo_id: int,
+    issue_rows: list[dict],
+) -> list[str]:
+    changed: list[str] = []
+    for start in range(0, len(issue_rows), ISSUE_UPSERT_CHUNK):
+        chunk = [{"repo_id": repo_id, **row} for row in issue_rows[start:start + ISSUE_UPSERT_CHUNK]]
+        issue_stmt = pg_insert(Issue).values(chunk)
+        columns = [column for column in chunk[0] if column != "github_id"]
+        issue_stmt = issue_stmt.on_conflict_do_update(
             index_elements=["github_id"],
-            set_={k: v for k, v in repo_values.items() if k != "github_id"},
+            set_={column: issue_stmt.excluded[column] for column in columns},
+            where=_distinct_from_excluded(
+                Issue.__table__, issue_stmt, [c for c in columns if c != "synced_at"]
+            ),
+        ).returning(Issue.github_id)
+        result = await session.execute(issue_stmt)
+        changed.extend(result.scalars())
+    return changed
+
+
+async def _merge_issue_delta(
+    session: AsyncSession,
+    repo_id: int,
+    delta: list[IssueRecord],
+) -> list[IssueRecord]:
+    result = await session.execute(
+        select(Issue.github_id, Issue.comment_count, Issue.created_at, Issue.updated_at).where(
+            Issue.repo_id == repo_id,
+            Issue.state == "open",
+            Issue.is_good_first_issue == True,  # noqa
+        )
+    )
+    merged = {
+        row.github_id: IssueRecord(
+            id=int(row.github_id),
+            title="",
+            comments=row.comment_count,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+        )
+        for row in result
+    }
+    for issue in delta:
+        if issue.state == "open":
+            merged[str(issue.id)] = issue
+        else:
+            merged.pop(str(issue.id), None)
+
+    oldest = datetime.min.replace(tzinfo=timezone.utc)
+    return sorted(merged.values(), key=lambda i: i.created_at or oldest, reverse=True)
+
+
+async def _close_missing_issues(
+    session: AsyncSession,
+    repo_id: int,
+    open_github_ids: list[str],
+) -> list[str]:
+    now = datetime.now(timezone.utc)
+    result = await session.execute(
+        update(Issue)
+        .where(
+            Issue.repo_id == repo_id,
+            Issue.state == "open",
+            Issue.github_id.not_in(open_github_ids),
         )
-        await session.execute(stmt)
+        .values(state="closed", closed_at=now, synced_at=now)
+        .returning(Issue.github_id)
+    )
+    closed = list(result.scalars())
+    if closed:
+        logger.info("Closed %d stale issues for repo %d", len(closed), repo_id)
+    return closed
+
+
+def is_webhook_fed(stored: Repository | None) -> bool:
+    if stored is None or stored.webhook_event_at is None:
+        return False
+    grace = timedelta(hours=settings.webhook_poll_grace_hours)
+    return stored.webhook_event_at > datetime.now(timezone.utc) - grace
+
+
+def is_unchanged_since_sync(repo_data: RepoRecord, stored: Repository | None) -> bool:
+    if is_webhook_fed(stored):
+        return True
+    if stored is None or stored.synced_at is None:
+        return False
+    if repo_data.pushed_at is None or repo_data.updated_at is None:
+        return False
+    return repo_data.pushed_at <= stored.synced_at and repo_data.updated_at <= stored.synced_at
+
+
+async def _load_stored_repos(
+    session: AsyncSession,
+    repos: list[RepoRecord],
+) -> dict[str, Repository]:
+    result = await session.execute(
+        select(Repository).where(Repository.github_id.in_([str(r.id) for r in repos]))
+    )
+    return {row.github_id: row for row in result.scalars().all()}
+
+
+async def refresh_unchanged_repo(
+    session: AsyncSession,
+    stored: Repository,
+    repo_data: RepoRecord,
+    commit: bool = True,
+) -> RepoChangeSet:
+
+    score_inputs = {
+        "last_commit_at": repo_data.pushed_at,
+        "last_pushed_at": repo_data.pushed_at,
+        "avg_pr_merge_hours": stored.avg_pr_merge_hours,
+        "avg_issue_response_hours": stored.avg_issue_response_hours,
+        "merged_pr_count": stored.merged_pr_count,
+        "closed_pr_count": stored.closed_pr_count,
+        "open_pr_count": stored.open_pr_count,
+        "contributor_count": stored.contributor_count,
+        "stars": repo_data.stargazers_count,
+        "forks": repo_data.forks_count,
+        "good_first_issue_count": stored.good_first_issue_count,
+        "has_contributing_guide": stored.has_contributing_guide,
+        "has_code_of_conduct": stored.has_code_of_conduct,
+        "has_readme": stored.has_readme,
+        "has_issue_templates": stored.has_issue_templates,
+        "has_pr_templates": stored.has_pr_templates,
+        "license_type": stored.license,
+    }
+    activity = calculate_activity_score(**score_inputs)
+    bf = calculate_beginner_friendliness_score(**score_inputs)
+    combined = calculate_combined_score(activity, bf)
+
+    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    commit_within_30d = repo_data.pushed_at and repo_data.pushed_at > thirty_days_ago
+    merged_within_30d = stored.last_merged_pr_at and stored.last_merged_pr_at > thirty_days_ago
+
+    changes = RepoChangeSet(repo=stored, fields=_diff_repo_fields(stored, {
+        "stars": repo_data.stargazers_count,
+        "forks": repo_data.forks_count,
+        "watchers": repo_data.watchers_count,
+        "open_issues_count": repo_data.open_issues_count,
+        "activity_score": activity,
+        "beginner_friendliness_score": bf,
+        "combined_score": combined,
+        "is_actively_merging": all([
+            commit_within_30d,
+            merged_within_30d,
+            stored.pr_merge_rate > 0.5,
+            stored.contributor_count > 5,
+            not repo_data.archived,
+        ]),
+        "is_active": True,
+    }))
+    for key, (_, value) in changes.fields.items():
+        setattr(stored, key, value)
+    if changes.fields:
+        stored.synced_at = datetime.now(timezone.utc)
+
+    await _record_history(
+        session,
+        repo_id=stored.id,
+        activity=activity,
+        bf=bf,
+        stars=stored.stars,
+        forks=stored.forks,
+        good_first_issue_count=stored.good_first_issue_count,
+        avg_pr_merge_hours=stored.avg_pr_merge_hours,
+    )
+    if commit:
+        await session.commit()
+    else:
         await session.flush()
+    logger.info(
+        "↻ %s unchanged | Activity: %.1f | BF: %.1f | Combined: %.1f | Changed: %s",
+        stored.full_name, activity, bf, combined, ", ".join(changes.fields) or "nothing",
+    )
+    return changes
+
+
+@dataclass(slots=True)
+class FetchedRepo:
+    repo_data: RepoRecord
+    stored: Repository | None
+    details: dict | None = None
+    open_gfis: list[IssueRecord] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class ComputedRepo:
+    repo_data: RepoRecord
+    stored: Repository | None
+    repo_values: dict
+    language_breakdown: list[dict]
+    issue_rows: dict[str, dict]
+    close_missing_issues: bool
+    avg_pr_merge_hours: float | None
+    payload: tuple[bytes, int] | None = None
+
+
+async def fetch_repo(
+    session: AsyncSession,
+    repo_data: RepoRecord,
+    stored: Repository | None,
+    incremental: bool = False,
+    details: dict | None = None,
+) -> FetchedRepo:
+    if incremental and is_unchanged_since_sync(repo_data, stored):
+        return FetchedRepo(repo_data=repo_data, stored=stored)
+
+    logger.info("Syncing %s ...", repo_data.full_name)
+
+    if details is None:
+        owner, name = repo_data.full_name.split("/", 1)
+        issues_since = stored.synced_at if incremental and stored else None
+        details = await fetch_repo_details(owner, name, issues_since=issues_since)
+
+    if details.get("issues_since") is not None and stored is not None:
+        open_gfis = await _merge_issue_delta(session, stored.id, details["issues"])
+    else:
+        open_gfis = [i for i in details["issues"] if i.state == "open"]
+
+    return FetchedRepo(repo_data=repo_data, stored=stored, details=details, open_gfis=open_gfis)
+
+
+def issue_row(issue_data: IssueRecord, now: datetime) -> dict:
+    labels = issue_data.labels
+    return {
+        "github_id": str(issue_data.id),
+        "title": issue_data.title[:500],
+        "body_preview": (issue_data.body or "")[:500],
+        "html_url": issue_data.html_url,
+        "state": issue_data.state,
+        "labels": labels,
+        "comment_count": issue_data.comments,
+        "difficulty_estimate": estimate_issue_difficulty(
+            labels=labels,
+            body=issue_data.body,
+            comment_count=issue_data.comments,
+        ),
+        "assignee_login": issue_data.assignee_login,
+        "is_assigned": issue_data.assignee_login is not None,
+        "is_good_first_issue": True,
+        "is_help_wanted": any("help wanted" in l.lower() for l in labels),
+        "created_at": issue_data.created_at,
+        "updated_at": issue_data.updated_at,
+        "closed_at": issue_data.closed_at,
+        "synced_at": now,
+    }
+
+
+def compute_repo_metrics(fetched: FetchedRepo, store_payload: bool = True) -> ComputedRepo:
+    repo_data = fetched.repo_data
+    details = fetched.details
+    full_name = repo_data.full_name
+    owner, name = full_name.split("/", 1)
 
-        result = await session.execute(
-            select(Repository).where(Repository.github_id == str(repo_data["id"]))
+    contributor_count = details["contributor_count"]
+    languages_data = details["languages"]
+    gfi_data = details["issues"]
+    pr_data = details["pulls"]
+    community = details["community"]
+    open_gfis = fetched.open_gfis
+
+    merged_prs = [p for p in pr_data if p.merged_at]
+    closed_prs = [p for p in pr_data if p.state == "closed" and not p.merged_at]
+    open_prs = [p for p in pr_data if p.state == "open"]
+    pr_counts = details.get("pr_counts")
+    if pr_counts:
+        merged_count, closed_count, open_count = pr_counts["merged"], pr_counts["closed"], pr_counts["open"]
+    else:
+        merged_count, closed_count, open_count = len(merged_prs), len(closed_prs), len(open_prs)
+
+    avg_pr_merge_hours = None
+    if merged_prs:
+        merge_times = []
+        for pr in merged_prs:
+            created = pr.created_at
+            merged = pr.merged_at
+            if created and merged:
+                hours = (merged - created).total_seconds() / 3600
+                merge_times.append(hours)
+        if merge_times:
+            avg_pr_merge_hours = sum(merge_times) / len(merge_times)
+
+    avg_issue_response_hours = None
+    if open_gfis:
+        commented = [i for i in open_gfis if i.comments > 0]
+        if commented:
+            response_times = []
+            for issue in commented[:20]:
+                created = issue.created_at
+                updated = issue.updated_at
+                if created and updated and updated > created:
+                    hours = (updated - created).total_seconds() / 3600
+                    response_times.append(min(hours, 720))
+            if response_times:
+                avg_issue_response_hours = sum(response_times) / len(response_times)
+
+    total_bytes = sum(languages_data.values()) if languages_data else 0
+    language_breakdown = []
+    if total_bytes > 0:
+        for lang, bytes_count in languages_data.items():
+            language_breakdown.append({
+                "language": lang,
+                "bytes_count": bytes_count,
+                "percentage": round((bytes_count / total_bytes) * 100, 1),
+            })
+
+    files = community.get("files", {}) if community else {}
+    has_contributing = files.get("contributing") is not None
+    has_coc = files.get("code_of_conduct") is not None
+    has_readme = files.get("readme") is not None
+    has_issue_template = files.get("issue_template") is not None
+    has_pr_template = files.get("pull_request_template") is not None
+
+    license_type = repo_data.license_spdx
+
+    score_inputs = {
+        "last_commit_at": repo_data.pushed_at,
+        "last_pushed_at": repo_data.pushed_at,
+        "avg_pr_merge_hours": avg_pr_merge_hours,
+        "avg_issue_response_hours": avg_issue_response_hours,
+        "merged_pr_count": merged_count,
+        "closed_pr_count": closed_count,
+        "open_pr_count": open_count,
+        "contributor_count": contributor_count,
+        "stars": repo_data.stargazers_count,
+        "forks": repo_data.forks_count,
+        "good_first_issue_count": len(open_gfis),
+        "has_contributing_guide": has_contributing,
+        "has_code_of_conduct": has_coc,
+        "has_readme": has_readme,
+        "has_issue_templates": has_issue_template,
+        "has_pr_templates": has_pr_template,
+        "license_type": license_type,
+    }
+
+    activity = calculate_activity_score(**score_inputs)
+    bf = calculate_beginner_friendliness_score(**score_inputs)
+    combined = calculate_combined_score(activity, bf)
+
+    if pr_counts and pr_counts["merged_30d"] + pr_counts["closed_30d"] > 0:
+        rate_merged, rate_closed = pr_counts["merged_30d"], pr_counts["closed_30d"]
+    else:
+        rate_merged, rate_closed = merged_count, closed_count
+    total_completed_prs = rate_merged + rate_closed
+    pr_merge_rate = rate_merged / total_completed_prs if total_completed_prs > 0 else 0.0
+
+    last_merged_pr_at = None
+    if merged_prs:
+        merge_dates = [p.merged_at for p in merged_prs if p.merged_at]
+        if merge_dates:
+            last_merged_pr_at = max(d for d in merge_dates if d is not None)
+
+    thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    if pr_counts:
+        recent_merged_30d = pr_counts["merged_30d"]
+    else:
+        recent_merged_30d = sum(
+            1 for p in merged_prs
+            if p.merged_at and p.merged_at > thirty_days_ago
         )
-        repo = result.scalar_one()
-
-        for lang_info in language_breakdown:
-            lang_stmt = pg_insert(RepoLanguage).values(
-                repo_id=repo.id,
-                language=lang_info["language"],
-                bytes_count=lang_info["bytes_count"],
-                percentage=lang_info["percentage"],
-            )
-            lang_stmt = lang_stmt.on_conflict_do_update(
-                constraint="uq_repo_language",
-                set_={
-                    "bytes_count": lang_info["bytes_count"],
-                    "percentage": lang_info["percentage"],
-                },
-            )
-            await session.execute(lang_stmt)
-
-        for issue_data in gfi_data:
-            labels = [l["name"] for l in issue_data.get("labels", [])]
-            difficulty = estimate_issue_difficulty(
-                labels=labels,
-                body=issue_data.get("body"),
-                comment_count=issue_data.get("comments", 0),
-            )
-            assignee = issue_data.get("assignee")
-
-            issue_values = {
-                "github_id": str(issue_data["id"]),
-                "repo_id": repo.id,
-                "title": issue_data["title"][:500],
-                "body_preview": (issue_data.get("body") or "")[:500],
-                "html_url": issue_data.get("html_url"),
-                "state": issue_data.get("state", "open"),
-                "labels": labels,
-                "comment_count": issue_data.get("comments", 0),
-                "difficulty_estimate": difficulty,
-                "assignee_login": assignee["login"] if assignee else None,
-                "is_assigned": assignee is not None,
-                "is_good_first_issue": True,
-                "is_help_wanted": any("help wanted" in l.lower() for l in labels),
-                "created_at": _parse_datetime(issue_data.get("created_at")),
-                "updated_at": _parse_datetime(issue_data.get("updated_at")),
-                "closed_at": _parse_datetime(issue_data.get("closed_at")),
-                "synced_at": datetime.now(timezone.utc),
-            }
-
-            issue_stmt = pg_insert(Issue).values(**issue_values)
-            issue_stmt = issue_stmt.on_conflict_do_update(
+
+    commit_within_30d = repo_data.pushed_at and repo_data.pushed_at > thirty_days_ago
+    merged_within_30d = last_merged_pr_at and last_merged_pr_at > thirty_days_ago
+    is_actively_merging = all([
+        commit_within_30d,
+        merged_within_30d,
+        pr_merge_rate > 0.5,
+        contributor_count > 5,
+        not repo_data.archived,
+    ])
+
+    repo_values = {
+        "github_id": str(repo_data.id),
+        "full_name": full_name,
+        "owner": owner,
+        "name": name,
+        "description": (repo_data.description or "")[:2000],
+        "primary_language": repo_data.language,
+        "stars": repo_data.stargazers_count,
+        "forks": repo_data.forks_count,
+        "open_issues_count": repo_data.open_issues_count,
+        "watchers": repo_data.watchers_count,
+        "license": license_type,
+        "created_at": repo_data.created_at,
+        "last_pushed_at": repo_data.pushed_at,
+        "last_commit_at": repo_data.pushed_at,
+        "activity_score": activity,
+        "beginner_friendliness_score": bf,
+        "combined_score": combined,
+        "good_first_issue_count": len(open_gfis),
+        "contributor_count": contributor_count,
+        "avg_pr_merge_hours": avg_pr_merge_hours,
+        "avg_issue_response_hours": avg_issue_response_hours,
+        "open_pr_count": open_count,
+        "closed_pr_count": closed_count,
+        "merged_pr_count": merged_count,
+        "has_contributing_guide": has_contributing,
+        "has_code_of_conduct": has_coc,
+        "has_readme": has_readme,
+        "has_issue_templates": has_issue_template,
+        "has_pr_templates": has_pr_template,
+        "last_merged_pr_at": last_merged_pr_at,
+        "pr_merge_rate": round(pr_merge_rate, 3),
+        "recent_merged_pr_count_30d": recent_merged_30d,
+        "is_actively_merging": is_actively_merging,
+        "topics": repo_data.topics,
+        "synced_at": datetime.now(timezone.utc),
+        "is_active": True,
+    }
+
+    now = datetime.now(timezone.utc)
+    issue_rows = {str(issue_data.id): issue_row(issue_data, now) for issue_data in gfi_data}
+
+    return ComputedRepo(
+        repo_data=repo_data,
+        stored=fetched.stored,
+        repo_values=repo_values,
+        language_breakdown=language_breakdown,
+        issue_rows=issue_rows,
+        close_missing_issues=(
+            details.get("issues_since") is None and details.get("issues_complete", False)
+        ),
+        avg_pr_merge_hours=avg_pr_merge_hours,
+        payload=(
+            compress_payload(project_payload(repo_data, details, open_gfis))
+            if store_payload and settings.sync_store_payloads else None
+        ),
+    )
+
+
+async def write_repo(
+    session: AsyncSession,
+    computed: ComputedRepo,
+    commit: bool = True,
+) -> RepoChangeSet:
+    stored = computed.stored
+    repo_values = computed.repo_values
+    changed_fields = _diff_repo_fields(stored, repo_values)
+
+    write_started = time.perf_counter()
+    async with session.begin_nested():
+        repo = stored
+        if stored is None or changed_fields:
+            stmt = pg_insert(Repository).values(**repo_values)
+            stmt = stmt.on_conflict_do_update(
                 index_elements=["github_id"],
-                set_={k: v for k, v in issue_values.items() if k != "github_id"},
+                set_={k: v for k, v in repo_values.items() if k != "github_id"},
+                where=_distinct_from_excluded(
+                    Repository.__table__, stmt,
+                    [k for k in repo_values if k not in UNTRACKED_REPO_FIELDS],
+                ),
+            ).returning(Repository)
+            result = await session.execute(
+                stmt, execution_options={"populate_existing": True}
+            )
+            repo = result.scalar_one_or_none() or stored
+        changes = RepoChangeSet(repo=repo, created=stored is None, fields=changed_fields)
+
+        changes.languages = await _replace_languages(session, repo.id, computed.language_breakdown)
+        if computed.payload is not None:
+            await save_payload(session, repo.id, *computed.payload)
+        changes.issues_updated = await upsert_issues(
+            session, repo.id, list(computed.issue_rows.values())
+        )
+
+        if computed.close_missing_issues:
+            changes.issues_closed = await _close_missing_issues(
+                session, repo.id, list(computed.issue_rows)
             )
-            await session.execute(issue_stmt)
 
-        from datetime import date as date_type
-        history_stmt = pg_insert(RepoMetricsHistory).values(
+        await _record_history(
+            session,
             repo_id=repo.id,
-            activity_score=activity,
-            beginner_friendliness_score=bf,
+            activity=repo_values["activity_score"],
+            bf=repo_values["beginner_friendliness_score"],
             stars=repo.stars,
             forks=repo.forks,
-            good_first_issue_count=len(gfi_data),
-            avg_pr_merge_hours=avg_pr_merge_hours,
-            recorded_date=date_type.today(),
-        )
-        history_stmt = history_stmt.on_conflict_do_update(
-            constraint="uq_repo_metrics_date",
-            set_={
-                "activity_score": activity,
-                "beginner_friendliness_score": bf,
-                "stars": repo.stars,
-                "forks": repo.forks,
-                "good_first_issue_count": len(gfi_data),
-                "avg_pr_merge_hours": avg_pr_merge_hours,
-            },
+            good_first_issue_count=repo_values["good_first_issue_count"],
+            avg_pr_merge_hours=computed.avg_pr_merge_hours,
         )
-        await session.execute(history_stmt)
 
+    if commit:
         await session.commit()
-        logger.info(
-            "✓ %s | Activity: %.1f | BF: %.1f | Combined: %.1f | GFIs: %d",
-            full_name, activity, bf, combined, len(gfi_data),
-        )
-        return repo
+    logger.info(
+        "✓ %s | Activity: %.1f | BF: %.1f | Combined: %.1f | GFIs: %d | DB: %.1fms | Changed: %s",
+        repo_values["full_name"], repo_values["activity_score"],
+        repo_values["beginner_friendliness_score"], repo_values["combined_score"],
+        repo_values["good_first_issue_count"],
+        (time.perf_counter() - write_started) * 1000,
+        "new repo" if changes.created else ", ".join(changes.fields) or "nothing",
+    )
+    return changes
+
+
+async def sync_single_repo(
+    session: AsyncSession,
+    repo_data: RepoRecord,
+    details: dict | None = None,
+    incremental: bool = False,
+    commit: bool = True,
+) -> RepoChangeSet | None:
+    return await _repo_sync_flights.do(
+        (repo_data.full_name, id(session), commit),
+        lambda: _sync_single_repo(session, repo_data, details, incremental, commit),
+    )
+
+
+async def _sync_single_repo(
+    session: AsyncSession,
+    repo_data: RepoRecord,
+    details: dict | None = None,
+    incremental: bool = False,
+    commit: bool = True,
+) -> RepoChangeSet | None:
+    try:
+        async with _repo_sync_locks.hold(repo_data.full_name):
+            stored = (await _load_stored_repos(session, [repo_data])).get(str(repo_data.id))
+            fetched = await fetch_repo(session, repo_data, stored, incremental, details)
+            if fetched.details is None:
+                return await refresh_unchanged_repo(session, stored, repo_data, commit=commit)
+            return await write_repo(session, compute_repo_metrics(fetched), commit=commit)
 
     except Exception as e:
-        logger.error("✗ Failed to sync %s: %s", full_name, e)
-        await session.rollback()
+        logger.error("✗ Failed to sync %s: %s", repo_data.full_name, e)
+        if commit:
+            await session.rollback()
         return None
 
 
-async def run_full_sync(max_repos: int = 200):
-    logger.info("═══ Starting full sync (max %d repos) ═══", max_repos)
+async def run_full_sync(max_repos: int = 200, incremental: bool = False) -> int:
+    if _sync_lock.locked():
+        logger.warning("Sync already running — skipping this run")
+        return 0
+
+    async with _sync_lock:
+        return await _run_sync(max_repos, incremental)
+
+
+async def run_scheduled_sync(max_repos: int = 200) -> int:
+    last_full = await last_started_run_at("full")
+    full_due_after = timedelta(
+        hours=settings.full_sync_interval_hours - settings.sync_interval_hours / 2
+    )
+    incremental = last_full is not None and datetime.now(timezone.utc) - last_full < full_due_after
+    return await run_full_sync(max_repos, incremental=incremental)
+
+
+async def run_adaptive_refresh(max_repos: int | None = None) -> int:
+    if _sync_lock.locked():
+        logger.warning("Sync already running — skipping adaptive refresh")
+        return 0
+
+    async with _sync_lock:
+        return await _run_adaptive_refresh(max_repos)
+
+
+async def _run_adaptive_refresh(max_repos: int | None) -> int:
+    budget = await request_budget()
+    if budget <= 0:
+        logger.info("Adaptive refresh skipped — no spare GitHub budget")
+        return 0
+
+    async with async_session_factory() as session:
+        due = await select_due_repos(session, budget, max_repos)
+    if not due:
+        logger.debug("Adaptive refresh: nothing due")
+        return 0
+
+    logger.info(
+        "═══ Adaptive refresh of %d repos (budget %d requests, top priority %.2f) ═══",
+        len(due), budget, due[0].refresh_priority,
+    )
+
+    async def load(full_name: str) -> RepoRecord | None:
+        owner, name = full_name.split("/", 1)
+        try:
+            with charge_repos(full_name):
+                return await github_client.get_repo(owner, name)
+        except Exception as e:
+            logger.warning("Could not refresh %s: %s", full_name, e)
+            return None
+
+    async def refreshed_records(repos: list[Repository]) -> AsyncIterator[RepoRecord]:
+        for future in asyncio.as_completed([load(repo.full_name) for repo in repos]):
+            repo_data = await future
+            if repo_data is not None:
+                yield repo_data
+
+    pinned = [repo for repo in due if repo.refresh_priority >= PINNED_PRIORITY]
+    scheduled = [repo for repo in due if repo.refresh_priority < PINNED_PRIORITY]
+    synced: set[str] = set()
+    success = 0
+    async with cost_scope("adaptive refresh"):
+        for repos, incremental in ((pinned, False), (scheduled, True)):
+            if repos:
+                success += await sync_repositories(
+                    refreshed_records(repos), incremental=incremental, synced=synced,
+                )
+
+    async with async_session_factory() as session:
+        await update_refresh_plans(
+            session, refreshed_ids=[repo.id for repo in due if repo.github_id in synced]
+        )
+        await session.commit()
 
-    candidates = await discover_repositories(max_pages_per_query=2)
-    logger.info("Discovered %d candidate repos", len(candidates))
+    logger.info("═══ Adaptive refresh complete: %d/%d repos synced ═══", success, len(due))
+    return success
 
-    popular = [r for r in candidates if r.get("stargazers_count", 0) > 500]
-    small = [r for r in candidates if r.get("stargazers_count", 0) <= 500]
 
-    popular.sort(key=lambda r: r.get("stargazers_count", 0), reverse=True)
-    small.sort(key=lambda r: r.get("stargazers_count", 0), reverse=True)
+async def _run_sync(max_repos: int, incremental: bool) -> int:
+    kind = "incremental" if incremental else "full"
+    run = await start_or_resume_run(kind, max_repos, distributed=settings.sync_distributed)
+    max_repos = run.max_repos
+    logger.info("═══ Starting %s sync run %d (max %d repos) ═══", kind, run.run_id, max_repos)
 
     popular_limit = int(max_repos * 0.6)
     small_limit = max_repos - popular_limit
+    counts = {"candidates": 0, "popular": 0, "small": 0, "over_budget": 0}
 
-    selected = popular[:popular_limit] + small[:small_limit]
+    async with async_session_factory() as session:
+        cost_model = await load_cost_model(session)
+    budget = {"requests": float(await request_budget())}
+    for repo_data in run.pending:
+        budget["requests"] -= cost_model.cost(str(repo_data.id))
     logger.info(
-        "Selected %d repos: %d popular + %d beginner-friendly",
-        len(selected), min(len(popular), popular_limit), min(len(small), small_limit),
+        "Request budget before reset: %d (~%.1f requests per repo)",
+        budget["requests"], cost_model.default,
     )
+    for stars in run.known.values():
+        counts["popular" if stars > 500 else "small"] += 1
 
-    success = 0
-    for repo_data in selected:
-        async with async_session_factory() as session:
-            result = await sync_single_repo(session, repo_data)
-            if result:
-                success += 1
+    async def select_candidates() -> AsyncIterator[RepoRecord]:
+        for repo_data in run.pending:
+            yield repo_data
+        if run.discovery_complete:
+            return
 
-        if github_client.rate_remaining < 200:
-            import asyncio
-            logger.warning("Rate limit low (%d), pausing 30s", github_client.rate_remaining)
-            await asyncio.sleep(30)
+        bands = CandidateBands(
+            popular_limit - counts["popular"], small_limit - counts["small"], skip=run.known
+        )
+        async with aclosing(iter_selected_repositories(bands)) as released:
+            async for batch in released:
+                selected: list[RepoRecord] = []
+                for repo_data in batch:
+                    cost = cost_model.cost(str(repo_data.id))
+                    if cost > budget["requests"]:
+                        counts["over_budget"] += 1
+                        continue
+                    budget["requests"] -= cost
+                    counts[bands.band(repo_data.stargazers_count)] += 1
+                    selected.append(repo_data)
+                counts["candidates"] = bands.seen
+                await add_run_items(run.run_id, selected)
+                for repo_data in selected:
+                    yield repo_data
+        counts["candidates"] = bands.seen
+        await add_run_items(run.run_id, [], discovery_complete=True)
+
+    synced: set[str] = set()
+    async with cost_scope(f"{kind} sync run {run.run_id}", run.run_id):
+        if run.distributed:
+            success = await _run_distributed(run.run_id, select_candidates())
+            synced = await done_github_ids(run.run_id)
+        else:
+            await sync_repositories(
+                select_candidates(), incremental=incremental, run_id=run.run_id, synced=synced
+            )
+            success = await finish_run(run.run_id)
+    logger.info(
+        "Selected %d repos: %d popular + %d beginner-friendly (from %d candidates, %d over budget)",
+        counts["popular"] + counts["small"], counts["popular"], counts["small"],
+        counts["candidates"], counts["over_budget"],
+    )
 
     await mark_inactive_repos()
 
+    try:
+        pruned = await github_client.prune_response_cache()
+        if pruned:
+            logger.info("Pruned %d stale cached GitHub responses", pruned)
+    except Exception as e:
+        logger.error("Response cache pruning failed: %s", e)
+
+    try:
+        async with async_session_factory() as session:
+            refreshed_ids = (
+                await session.execute(select(Repository.id).where(Repository.github_id.in_(list(synced))))
+            ).scalars()
+            await update_refresh_plans(session, refreshed_ids=refreshed_ids)
+            await session.commit()
+    except Exception as e:
+        logger.error("Refresh planning failed: %s", e)
+
     try:
         from app.services.notification_service import check_subscriptions
         await check_subscriptions()
     except Exception as e:
         logger.error("Notification check failed: %s", e)
 
-    logger.info("═══ Sync complete: %d/%d repos synced ═══", success, len(candidates))
+    logger.info("═══ Sync complete: %d/%d repos synced ═══", success, counts["candidates"])
+    return success
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def process_queue_batch(worker: str, run_id: int | None = None) -> int:
+    claimed = await claim_items(worker, settings.sync_claim_batch_size, run_id=run_id)
+    if not claimed:
+        return 0
+
+    by_run: dict[tuple[int, str], list[RepoRecord]] = {}
+    for item in claimed:
+        by_run.setdefault((item.run_id, item.kind), []).append(item.repo_data)
+
+    async def keep_leases():
+        item_ids = [item.item_id for item in claimed]
+        while True:
+            await asyncio.sleep(settings.sync_claim_lease_minutes * 60 / 3)
+            try:
+                renewed = await renew_claims(worker, item_ids)
+            except Exception as e:
+                logger.error("Failed to renew claims for worker %s: %s", worker, e)
+                continue
+            if renewed < len(item_ids):
+                logger.warning(
+                    "Worker %s lost %d of %d claims", worker, len(item_ids) - renewed, len(item_ids)
+                )
+
+    heartbeat = asyncio.create_task(keep_leases())
+    try:
+        for (claimed_run_id, kind), records in by_run.items():
+            logger.info("Worker %s claimed %d repos from run %d", worker, len(records), claimed_run_id)
+            await sync_repositories(
+                records, incremental=kind == "incremental", run_id=claimed_run_id, worker=worker,
+            )
+    finally:
+        heartbeat.cancel()
+    return len(claimed)
+
+
+async def _run_distributed(run_id: int, candidates: AsyncIterator[RepoRecord]) -> int:
+    discovery_done = asyncio.Event()
+
+    async def enqueue():
+        try:
+            async for _ in candidates:
+                pass
+        finally:
+            discovery_done.set()
+
+    async def drain():
+        worker = worker_id()
+        while True:
+            if await process_queue_batch(worker, run_id=run_id):
+                continue
+            if discovery_done.is_set() and not await has_open_items(run_id):
+                return
+            await asyncio.sleep(settings.sync_queue_poll_seconds)
+
+    logger.info("Run %d queued for distributed workers", run_id)
+    await asyncio.gather(enqueue(), drain())
+    return await finish_run(run_id)
+
+
+async def _iterate(repos: Iterable[RepoRecord] | AsyncIterable[RepoRecord]) -> AsyncIterator[RepoRecord]:
+    if isinstance(repos, AsyncIterable):
+        async for repo_data in repos:
+            yield repo_data
+    else:
+        for repo_data in repos:
+            yield repo_data
+
+
+async def sync_repositories(
+    repos: Iterable[RepoRecord] | AsyncIterable[RepoRecord],
+    incremental: bool = False,
+    run_id: int | None = None,
+    worker: str | None = None,
+    synced: set[str] | None = None,
+) -> int:
+    use_graphql = settings.github_sync_use_graphql
+    batch_size = settings.github_graphql_batch_size if use_graphql else 1
+    db_capacity = settings.db_pool_size + settings.db_max_overflow
+    fetch_workers = max(1, settings.sync_concurrency)
+    compute_workers = max(1, settings.sync_compute_concurrency)
+    write_workers = max(1, min(settings.sync_write_concurrency, db_capacity))
+    write_batch_size = max(1, settings.sync_write_batch_size)
+    queue_size = max(1, settings.sync_queue_size)
+
+    fetch_queue: asyncio.Queue[RepoRecord | None] = asyncio.Queue(
+        maxsize=max(queue_size, fetch_workers * batch_size)
+    )
+    compute_queue: asyncio.Queue[FetchedRepo | None] = asyncio.Queue(maxsize=queue_size)
+    write_queue: asyncio.Queue[FetchedRepo | ComputedRepo | None] = asyncio.Queue(maxsize=queue_size)
+
+    pipeline = start_pipeline()
+    discover_stage = pipeline.stage("discover", 1)
+    fetch_stage = pipeline.stage("fetch", fetch_workers, fetch_queue)
+    compute_stage = pipeline.stage("compute", compute_workers, compute_queue)
+    compute_pool = ThreadPoolExecutor(max_workers=compute_workers, thread_name_prefix="sync-compute")
+    write_stage = pipeline.stage("write", write_workers, write_queue)
+
+    progress = {"done": 0, "success": 0, "changed": 0}
+    errors: dict[str, str] = {}
+    held: Counter[str] = Counter()
+
+    async def hold(repo_data: RepoRecord):
+        await _repo_sync_locks.acquire(repo_data.full_name)
+        held[repo_data.full_name] += 1
+
+    def release(repo_data: RepoRecord):
+        if held[repo_data.full_name] > 0:
+            held[repo_data.full_name] -= 1
+            _repo_sync_locks.release(repo_data.full_name)
+    started = time.monotonic()
+
+    def record_progress(results: list[RepoChangeSet | None]):
+        for result in results:
+            progress["done"] += 1
+            if result:
+                progress["success"] += 1
+                if result.changed:
+                    progress["changed"] += 1
+
+            done = progress["done"]
+            if done % settings.sync_progress_every == 0:
+                elapsed = time.monotonic() - started
+                logger.info(
+                    "Progress: %d repos (%d ok, %d changed, %d failed) — %.2f repos/s | "
+                    "queues fetch=%d compute=%d write=%d",
+                    done, progress["success"], progress["changed"], done - progress["success"],
+                    done / elapsed if elapsed else 0.0,
+                    fetch_queue.qsize(), compute_queue.qsize(), write_queue.qsize(),
+                )
+
+    def fail(stage, repo_data: RepoRecord, error: Exception):
+        logger.error("✗ Failed to sync %s in %s stage: %s", repo_data.full_name, stage.name, error)
+        stage.failed += 1
+        errors[str(repo_data.id)] = f"{stage.name}: {error}"
+        release(repo_data)
+        record_progress([None])
+
+    async def run_stage(worker, workers: int, downstream: asyncio.Queue | None, downstream_workers: int):
+        try:
+            await asyncio.gather(*(worker() for _ in range(workers)))
+        finally:
+            if downstream is not None:
+                for _ in range(downstream_workers):
+                    await downstream.put(None)
+
+    async def discover():
+        waited = time.monotonic()
+        async for repo_data in _iterate(repos):
+            discover_stage.busy_seconds += time.monotonic() - waited
+            discover_stage.processed += 1
+            await fetch_queue.put(repo_data)
+            waited = time.monotonic()
+
+    async def fetcher():
+        finished = False
+        while not finished:
+            first = await fetch_queue.get()
+            if first is None:
+                return
+            batch = [first]
+            while len(batch) < batch_size:
+                try:
+                    nxt = fetch_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if nxt is None:
+                    finished = True
+                    break
+                batch.append(nxt)
+
+            for repo_data in sorted(batch, key=lambda r: r.full_name):
+                await hold(repo_data)
+
+            with fetch_stage.busy():
+                try:
+                    async with async_session_factory() as session:
+                        stored = await _load_stored_repos(session, batch)
+                except Exception as e:
+                    for repo_data in batch:
+                        fail(fetch_stage, repo_data, e)
+                    continue
+
+                prefetched: dict[str, dict] = {}
+                if use_graphql:
+                    to_fetch = [
+                        r for r in batch
+                        if not (incremental and is_unchanged_since_sync(r, stored.get(str(r.id))))
+                    ]
+                    with charge_repos(*(r.full_name for r in to_fetch)):
+                        prefetched = await fetch_repo_details_batch([r.full_name for r in to_fetch])
+
+            for repo_data in batch:
+                with fetch_stage.busy():
+                    try:
+                        async with async_session_factory() as session:
+                            with charge_repos(repo_data.full_name):
+                                fetched = await fetch_repo(
+                                    session,
+                                    repo_data,
+                                    stored.get(str(repo_data.id)),
+                                    incremental=incremental,
+                                    details=prefetched.get(repo_data.full_name),
+                                )
+                    except Exception as e:
+                        fail(fetch_stage, repo_data, e)
+                        continue
+                fetch_stage.processed += 1
+                if fetched.details is None:
+                    await write_queue.put(fetched)
+                else:
+                    await compute_queue.put(fetched)
+
+    async def computer():
+        loop = asyncio.get_running_loop()
+        while (fetched := await compute_queue.get()) is not None:
+            with compute_stage.busy():
+                try:
+                    computed = await loop.run_in_executor(compute_pool, compute_repo_metrics, fetched)
+                except Exception as e:
+                    fail(compute_stage, fetched.repo_data, e)
+                    continue
+            compute_stage.processed += 1
+            await write_queue.put(computed)
+
+    async def write_one(session: AsyncSession, item: FetchedRepo | ComputedRepo) -> RepoChangeSet | None:
+        try:
+            if isinstance(item, FetchedRepo):
+                async with session.begin_nested():
+                    stored = (await _load_stored_repos(session, [item.repo_data])).get(
+                        str(item.repo_data.id)
+                    )
+                    return await refresh_unchanged_repo(session, stored, item.repo_data, commit=False)
+            return await write_repo(session, item, commit=False)
+        except Exception as e:
+            logger.error("✗ Failed to sync %s in write stage: %s", item.repo_data.full_name, e)
+            write_stage.failed += 1
+            errors[str(item.repo_data.id)] = f"write: {e}"
+            return None
+
+    async def writer():
+        finished = False
+        while not finished:
+            first = await write_queue.get()
+            if first is None:
+                return
+            batch = [first]
+            while len(batch) < write_batch_size:
+                try:
+                    nxt = write_queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if nxt is None:
+                    finished = True
+                    break
+                batch.append(nxt)
+
+            with write_stage.busy():
+                async with async_session_factory() as session:
+                    results = [await write_one(session, item) for item in batch]
+                    try:
+                        if run_id is not None:
+                            await mark_items_done(session, run_id, [
+                                item.repo_data for item, result in zip(batch, results) if result
+                            ], worker=worker)
+                        await session.commit()
+                    except Exception as e:
+                        logger.error("✗ Failed to commit %d synced repos: %s", len(batch), e)
+                        await session.rollback()
+                        write_stage.failed += sum(1 for r in results if r)
+                        for item in batch:
+                            errors[str(item.repo_data.id)] = f"commit: {e}"
+                        results = [None] * len(batch)
+            for item in batch:
+                release(item.repo_data)
+            if synced is not None:
+                synced.update(str(item.repo_data.id) for item, result in zip(batch, results) if result)
+            write_stage.processed += sum(1 for r in results if r)
+            record_progress(results)
+
+    logger.info(
+        "Sync pipeline: %d fetchers, %d compute, %d writers (batches of up to %d)",
+        fetch_workers, compute_workers, write_workers, write_batch_size,
+    )
+    label = f"sync run {run_id}" if run_id is not None else "sync"
+    try:
+        async with cost_scope(label, run_id):
+            await asyncio.gather(
+                run_stage(discover, 1, fetch_queue, fetch_workers),
+                run_stage(fetcher, fetch_workers, compute_queue, compute_workers),
+                run_stage(computer, compute_workers, write_queue, write_workers),
+                run_stage(writer, write_workers, None, 0),
+            )
+    finally:
+        compute_pool.shutdown(wait=False, cancel_futures=True)
+        for full_name, count in held.items():
+            for _ in range(count):
+                _repo_sync_locks.release(full_name)
+        pipeline.finish()
+        if run_id is not None:
+            await mark_items_failed(run_id, errors, worker=worker)
+
+    logger.info(
+        "Sync pipeline finished in %.1fs — bottleneck: %s",
+        time.monotonic() - started, pipeline.bottleneck,
+    )
+    return progress["success"]
 
 
 async def mark_inactive_repos():
-    from datetime import timedelta
 
     cutoff = datetime.now(timezone.utc) - timedelta(days=60)
 
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+import orjson
+import zstandard
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.repo_payload import RepoPayload
+from app.services.github_records import IssueRecord, PullRecord, RepoRecord, decode_json
+
+logger = logging.getLogger(__name__)
+
+PAYLOAD_VERSION = 1
+COMMUNITY_FILES = ("contributing", "code_of_conduct", "readme", "issue_template", "pull_request_template")
+
+
+@dataclass(slots=True)
+class StoredPayload:
+    repo_data: RepoRecord
+    details: dict
+    open_gfis: list[IssueRecord]
+
+
+def project_payload(repo_data: RepoRecord, details: dict, open_gfis: list[IssueRecord]) -> dict:
+    files = (details.get("community") or {}).get("files") or {}
+    return {
+        "version": PAYLOAD_VERSION,
+        "repo": repo_data.to_api(),
+        "contributor_count": details["contributor_count"],
+        "languages": details["languages"] or {},
+        "issues": [issue.to_api() for issue in open_gfis],
+        "pulls": [pull.to_api() for pull in details["pulls"]],
+        "pr_counts": details.get("pr_counts"),
+        "community_files": [name for name in COMMUNITY_FILES if files.get(name) is not None],
+    }
+
+
+def compress_payload(payload: dict) -> tuple[bytes, int]:
+    raw = orjson.dumps(payload)
+    return zstandard.ZstdCompressor(level=settings.payload_zstd_level).compress(raw), len(raw)
+
+
+def load_payload(blob: bytes) -> StoredPayload:
+    payload = decode_json(zstandard.ZstdDecompressor().decompress(blob))
+    open_gfis = [IssueRecord.from_api(issue) for issue in payload["issues"]]
+    return StoredPayload(
+        repo_data=RepoRecord.from_api(payload["repo"]),
+        details={
+            "contributor_count": payload["contributor_count"],
+            "languages": payload["languages"],
+            "issues": open_gfis,
+            "pulls": [PullRecord.from_api(pull) for pull in payload["pulls"]],
+            "pr_counts": payload.get("pr_counts"),
+            "community": {"files": {name: {} for name in payload["community_files"]}},
+            "issues_since": None,
+            "issues_complete": False,
+        },
+        open_gfis=open_gfis,
+    )
+
+
+async def save_payload(session: AsyncSession, repo_id: int, blob: bytes, raw_size: int):
+    values = {
+        "repo_id": repo_id,
+        "version": PAYLOAD_VERSION,
+        "payload": blob,
+        "raw_size": raw_size,
+        "fetched_at": datetime.now(timezone.utc),
+    }
+    stmt = pg_insert(RepoPayload).values(**values)
+    await session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["repo_id"],
+            set_={k: v for k, v in values.items() if k != "repo_id"},
+            where=RepoPayload.payload.is_distinct_from(stmt.excluded.payload),
+        )
+    )
@@ -0,0 +1,225 @@
+import heapq
+import logging
+import math
+import statistics
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.metrics_history import RepoMetricsHistory
+from app.models.repository import Repository
+from app.models.subscription import UserSubscription
+from app.services.github_client import github_client
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DAYS = 14
+VOLATILITY_WEIGHT = 0.5
+DEMAND_WEIGHT = 0.3
+RANK_WEIGHT = 0.2
+PINNED_PRIORITY = 10.0
+
+
+def history_change_rate(
+    days: int,
+    min_stars: int | None,
+    max_stars: int | None,
+    min_gfis: int | None,
+    max_gfis: int | None,
+    min_activity: float | None,
+    max_activity: float | None,
+) -> float:
+    if days < 2:
+        return 0.0
+    star_growth = ((max_stars or 0) - (min_stars or 0)) / max(max_stars or 0, 1)
+    gfi_churn = (max_gfis or 0) - (min_gfis or 0)
+    activity_drift = (max_activity or 0.0) - (min_activity or 0.0)
+    per_day = (star_growth * 100 + gfi_churn + activity_drift) / (days - 1)
+    return per_day / (per_day + 1)
+
+
+def push_volatility(last_pushed_at: datetime | None, now: datetime) -> float:
+    if last_pushed_at is None:
+        return 0.0
+    days = max((now - last_pushed_at).total_seconds() / 86400, 0)
+    return math.exp(-days / 7)
+
+
+def refresh_priority(volatility: float, demand: float, rank_weight: float) -> float:
+    return (
+        VOLATILITY_WEIGHT * volatility
+        + DEMAND_WEIGHT * demand
+        + RANK_WEIGHT * rank_weight
+    )
+
+
+def refresh_interval(priority: float) -> timedelta:
+    low = settings.refresh_min_interval_hours
+    high = settings.refresh_max_interval_hours
+    hours = high - (high - low) * min(max(priority, 0.0), 1.0)
+    return timedelta(hours=hours)
+
+
+async def request_budget() -> int:
+    await github_client.refresh_rate_limits()
+    return max(github_client.rate_remaining - settings.refresh_budget_reserve, 0)
+
+
+@dataclass(slots=True)
+class CostModel:
+    costs: dict[str, float]
+    default: float
+
+    def cost(self, github_id: str) -> float:
+        return self.costs.get(github_id, self.default)
+
+
+async def load_cost_model(session: AsyncSession) -> CostModel:
+    result = await session.execute(
+        select(Repository.github_id, Repository.sync_cost).where(
+            Repository.sync_cost.is_not(None)
+        )
+    )
+    costs = dict(result.all())
+    default = (
+        statistics.median(costs.values()) if costs else float(settings.refresh_cost_per_repo)
+    )
+    return CostModel(costs=costs, default=max(default, 1.0))
+
+
+async def _language_demand(session: AsyncSession) -> tuple[dict[str, int], int]:
+    result = await session.execute(
+        select(func.lower(UserSubscription.language), func.count(UserSubscription.id))
+        .where(UserSubscription.is_active == True)  # noqa
+        .group_by(func.lower(UserSubscription.language))
+    )
+    demand = {language: count for language, count in result}
+    return demand, demand.pop(None, 0)
+
+
+async def update_refresh_plans(
+    session: AsyncSession,
+    refreshed_ids: Iterable[int] = (),
+) -> int:
+    now = datetime.now(timezone.utc)
+    refreshed = set(refreshed_ids)
+
+    rows = (
+        await session.execute(
+            select(
+                Repository.id,
+                Repository.primary_language,
+                Repository.last_pushed_at,
+                Repository.refresh_priority,
+                Repository.next_refresh_at,
+            )
+            .where(Repository.is_active == True)  # noqa
+            .order_by(Repository.combined_score.desc())
+        )
+    ).all()
+    if not rows:
+        return 0
+
+    history = await session.execute(
+        select(
+            RepoMetricsHistory.repo_id,
+            func.count(RepoMetricsHistory.id),
+            func.min(RepoMetricsHistory.stars),
+            func.max(RepoMetricsHistory.stars),
+            func.min(RepoMetricsHistory.good_first_issue_count),
+            func.max(RepoMetricsHistory.good_first_issue_count),
+            func.min(RepoMetricsHistory.activity_score),
+            func.max(RepoMetricsHistory.activity_score),
+        )
+        .where(RepoMetricsHistory.recorded_date >= date.today() - timedelta(days=HISTORY_DAYS))
+        .group_by(RepoMetricsHistory.repo_id)
+    )
+    change_rates = {row[0]: history_change_rate(*row[1:]) for row in history}
+
+    demand, any_language = await _language_demand(session)
+    peak_demand = max(demand.values(), default=0) + any_language
+
+    plans = []
+    for rank, row in enumerate(rows):
+        if row.refresh_priority >= PINNED_PRIORITY and row.id not in refreshed:
+            continue
+
+        volatility = max(
+            change_rates.get(row.id, 0.0),
+            push_volatility(row.last_pushed_at, now),
+        )
+        watchers = demand.get((row.primary_language or "").lower(), 0) + any_language
+        priority = round(refresh_priority(
+            volatility=volatility,
+            demand=watchers / peak_demand if peak_demand else 0.0,
+            rank_weight=1 - rank / len(rows),
+        ), 3)
+
+        next_refresh_at = now + refresh_interval(priority)
+        if row.id not in refreshed and row.next_refresh_at is not None:
+            next_refresh_at = min(row.next_refresh_at, next_refresh_at)
+
+        if priority != row.refresh_priority or next_refresh_at != row.next_refresh_at:
+            plans.append({
+                "id": row.id,
+                "refresh_priority": priority,
+                "next_refresh_at": next_refresh_at,
+            })
+
+    if plans:
+        await session.execute(update(Repository), plans)
+    logger.info("Updated refresh plans for %d/%d repos", len(plans), len(rows))
+    return len(plans)
+
+
+def _effective_priority(repo: Repository, now: datetime) -> float:
+    if repo.next_refresh_at is None:
+        return repo.refresh_priority + 1.0
+    overdue_hours = (now - repo.next_refresh_at).total_seconds() / 3600
+    return repo.refresh_priority + min(max(overdue_hours, 0) / 24, 1.0) * 0.25
+
+
+async def select_due_repos(
+    session: AsyncSession,
+    budget: int,
+    limit: int | None = None,
+) -> list[Repository]:
+    limit = settings.refresh_max_repos if limit is None else limit
+    if budget <= 0 or limit <= 0:
+        return []
+    now = datetime.now(timezone.utc)
+    webhook_cutoff = now - timedelta(hours=settings.webhook_poll_grace_hours)
+    result = await session.execute(
+        select(Repository).where(
+            Repository.is_active == True,  # noqa
+            or_(Repository.next_refresh_at.is_(None), Repository.next_refresh_at <= now),
+            or_(Repository.webhook_event_at.is_(None), Repository.webhook_event_at <= webhook_cutoff),
+        )
+    )
+    due = [(-_effective_priority(r, now), r.id, r) for r in result.scalars().all()]
+    heapq.heapify(due)
+    cost_model = await load_cost_model(session)
+
+    selected = []
+    while due and len(selected) < limit:
+        _, _, repo = heapq.heappop(due)
+        cost = cost_model.cost(repo.github_id)
+        if cost > budget:
+            continue
+        budget -= cost
+        selected.append(repo)
+    return selected
+
+
+async def push_to_front(session: AsyncSession, full_names: list[str]) -> list[str]:
+    result = await session.execute(
+        update(Repository)
+        .where(Repository.full_name.in_(full_names))
+        .values(refresh_priority=PINNED_PRIORITY, next_refresh_at=datetime.now(timezone.utc))
+        .returning(Repository.full_name)
+    )
+    return list(result.scalars())
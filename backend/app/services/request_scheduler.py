@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator
+
+import httpx
+
+if TYPE_CHECKING:
+    from app.services.shared_budget import SharedBudgetStore
+
+logger = logging.getLogger(__name__)
+
+
+def resource_for_path(url: str) -> str:
+    if url.startswith("/search/"):
+        return "search"
+    if url.startswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+class RateBudget:
+
+    def __init__(self, resource: str, limit: int = 5000, reserve: int = 5):
+        self.resource = resource
+        self.limit = limit
+        self.remaining = limit
+        self.reset: float = 0
+        self.reserve = reserve
+        self._next_slot: float = 0
+
+    def update(self, headers: httpx.Headers):
+        limit = headers.get("x-ratelimit-limit")
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if limit is not None:
+            self.limit = int(limit)
+        if reset is not None:
+            reset_at = float(reset)
+            if reset_at > self.reset:
+                self.reset = reset_at
+                if remaining is not None:
+                    self.remaining = int(remaining)
+                return
+        if remaining is not None:
+            self.remaining = min(self.remaining, int(remaining))
+
+    def set(self, limit: int, remaining: int, reset: float):
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+
+    def exhaust(self, reset_at: float | None = None):
+        self.remaining = 0
+        if reset_at:
+            self.reset = reset_at
+
+    def _seconds_until_reset(self) -> float:
+        return max(self.reset - time.time(), 0)
+
+    def delay(self) -> float:
+        now = time.time()
+        if self.reset and now >= self.reset:
+            self.remaining = self.limit
+            return 0.0
+
+        if self.remaining <= self.reserve:
+            return max(self._seconds_until_reset(), 1.0)
+
+        low_water = self.limit * 0.2
+        if self.remaining < low_water:
+            interval = self._seconds_until_reset() / max(self.remaining - self.reserve, 1)
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + interval
+            return slot - now
+        return 0.0
+
+    def consume(self):
+        self.remaining = max(self.remaining - 1, 0)
+
+
+class GitHubToken:
+
+    def __init__(self, value: str | None):
+        self.value = value
+        self.budgets: dict[str, RateBudget] = {
+            "core": RateBudget("core"),
+            "search": RateBudget("search", limit=30, reserve=0),
+            "graphql": RateBudget("graphql"),
+        }
+        self.throttled_until: float = 0
+        self.requests = 0
+
+    @property
+    def label(self) -> str:
+        if not self.value:
+            return "anonymous"
+        return f"...{self.value[-4:]}"
+
+    @property
+    def auth_headers(self) -> dict[str, str]:
+        if not self.value:
+            return {}
+        return {"Authorization": f"Bearer {self.value}"}
+
+    def budget(self, resource: str) -> RateBudget:
+        if resource not in self.budgets:
+            self.budgets[resource] = RateBudget(resource)
+        return self.budgets[resource]
+
+    def headroom(self, resource: str) -> float:
+        budget = self.budget(resource)
+        if self.throttled_until > time.time():
+            return -1.0
+        if budget.reset and time.time() >= budget.reset:
+            return 1.0
+        if budget.remaining <= budget.reserve:
+            return -1.0
+        return budget.remaining / max(budget.limit, 1)
+
+    def available_at(self, resource: str) -> float:
+        budget = self.budget(resource)
+        blocked_until = self.throttled_until
+        if budget.remaining <= budget.reserve and budget.reset:
+            blocked_until = max(blocked_until, budget.reset)
+        return blocked_until
+
+    def stats(self) -> dict:
+        return {
+            "token": self.label,
+            "requests": self.requests,
+            "throttled_for": round(max(self.throttled_until - time.time(), 0), 1),
+            "budgets": {
+                name: {"remaining": b.remaining, "limit": b.limit, "reset": int(b.reset)}
+                for name, b in self.budgets.items()
+            },
+        }
+
+
+class TokenPool:
+
+    def __init__(self, tokens: list[str]):
+        self.tokens = [GitHubToken(t) for t in tokens] or [GitHubToken(None)]
+
+    def choose(self, resource: str) -> GitHubToken:
+        best = max(self.tokens, key=lambda t: t.headroom(resource))
+        if best.headroom(resource) >= 0:
+            return best
+        return min(self.tokens, key=lambda t: t.available_at(resource))
+
+    def remaining(self, resource: str = "core") -> int:
+        return sum(t.budget(resource).remaining for t in self.tokens)
+
+    def reset_at(self, resource: str = "core") -> float | None:
+        now = time.time()
+        resets = [t.budget(resource).reset for t in self.tokens if t.budget(resource).reset > now]
+        return min(resets, default=None)
+
+
+class RequestScheduler:
+
+    def __init__(
+        self,
+        tokens: list[str] | None = None,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_rate_wait: float = 60.0,
+        shared: SharedBudgetStore | None = None,
+    ):
+        self.pool = TokenPool(tokens or [])
+        self.shared = shared
+        self.max_concurrency = max_concurrency * len(self.pool.tokens)
+        self.min_concurrency = min_concurrency
+        self.max_rate_wait = max_rate_wait
+        self._limit = max(min_concurrency, self.max_concurrency // 2)
+        self._in_flight = 0
+        self._successes = 0
+        self._cond: asyncio.Condition | None = None
+
+    def _condition(self) -> asyncio.Condition:
+        if self._cond is None:
+            self._cond = asyncio.Condition()
+        return self._cond
+
+    @asynccontextmanager
+    async def slot(self, resource: str = "core") -> AsyncIterator[GitHubToken]:
+        cond = self._condition()
+        async with cond:
+            await cond.wait_for(lambda: self._in_flight < self._limit)
+            self._in_flight += 1
+
+        try:
+            if self.shared is not None:
+                await self.shared.sync(self.pool)
+            token = self.pool.choose(resource)
+            budget = token.budget(resource)
+            delay = max(token.throttled_until - time.time(), budget.delay())
+            if delay > 0:
+                if delay > 5:
+                    logger.warning(
+                        "GitHub %s budget low on token %s (%d left). Sleeping %.0f seconds",
+                        resource, token.label, budget.remaining, min(delay, self.max_rate_wait),
+                    )
+                await asyncio.sleep(min(delay, self.max_rate_wait))
+            budget.consume()
+            token.requests += 1
+            yield token
+        finally:
+            async with cond:
+                self._in_flight -= 1
+                cond.notify_all()
+
+    def observe(self, token: GitHubToken, resource: str, headers: httpx.Headers):
+        token.budget(headers.get("x-ratelimit-resource") or resource).update(headers)
+
+    async def on_success(self):
+        self._successes += 1
+        if self._limit < self.max_concurrency and self._successes >= self._limit * 4:
+            self._successes = 0
+            self._limit += 1
+            logger.debug("GitHub concurrency raised to %d", self._limit)
+            cond = self._condition()
+            async with cond:
+                cond.notify_all()
+
+    def exhaust(self, token: GitHubToken, resource: str, reset_at: float | None = None):
+        token.budget(resource).exhaust(reset_at)
+        if self.shared is not None:
+            self.shared.force = True
+
+    def on_throttled(self, token: GitHubToken, retry_after: float):
+        self._successes = 0
+        self._limit = max(self.min_concurrency, self._limit // 2)
+        token.throttled_until = max(token.throttled_until, time.time() + retry_after)
+        if self.shared is not None:
+            self.shared.force = True
+        logger.warning(
+            "GitHub throttled token %s — pausing it %.0fs, concurrency now %d",
+            token.label, retry_after, self._limit,
+        )
+
+    def on_error(self):
+        self._successes = 0
+        self._limit = max(self.min_concurrency, self._limit - 1)
+
+    @property
+    def concurrency_limit(self) -> int:
+        return self._limit
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def remaining(self, resource: str = "core") -> int:
+        return self.pool.remaining(resource)
+
+    def stats(self) -> dict:
+        return {
+            "concurrency_limit": self._limit,
+            "in_flight": self._in_flight,
+            "tokens": [t.stats() for t in self.pool.tokens],
+        }
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from app.database import async_session_factory
+from app.models.github_cache import GitHubResponseCache
+
+logger = logging.getLogger(__name__)
+
+
+class ConditionalResponseStore:
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(url: str, params: dict[str, Any] | None = None) -> str:
+        normalized = url + "?" + "&".join(
+            f"{k}={v}" for k, v in sorted((params or {}).items()) if v is not None
+        )
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    async def get(self, key: str) -> GitHubResponseCache | None:
+        try:
+            async with async_session_factory() as session:
+                result = await session.execute(
+                    select(GitHubResponseCache).where(GitHubResponseCache.cache_key == key)
+                )
+                return result.scalar_one_or_none()
+        except Exception as e:
+            logger.debug("Response cache lookup failed: %s", e)
+            return None
+
+    async def touch(self, key: str) -> None:
+        try:
+            async with async_session_factory() as session:
+                await session.execute(
+                    update(GitHubResponseCache)
+                    .where(GitHubResponseCache.cache_key == key)
+                    .values(fetched_at=datetime.now(timezone.utc))
+                )
+                await session.commit()
+        except Exception as e:
+            logger.debug("Response cache touch failed: %s", e)
+
+    async def prune(self, max_age: timedelta) -> int:
+        async with async_session_factory() as session:
+            result = await session.execute(
+                delete(GitHubResponseCache).where(
+                    GitHubResponseCache.fetched_at < datetime.now(timezone.utc) - max_age
+                )
+            )
+            await session.commit()
+        return result.rowcount
+
+    async def put(
+        self,
+        key: str,
+        url: str,
+        body: bytes,
+        etag: str | None,
+        last_modified: str | None,
+        link: str | None,
+    ) -> None:
+        values = {
+            "cache_key": key,
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "link": link,
+            "body": body,
+            "fetched_at": datetime.now(timezone.utc),
+        }
+        try:
+            async with async_session_factory() as session:
+                stmt = pg_insert(GitHubResponseCache).values(**values)
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=["cache_key"],
+                    set_={k: v for k, v in values.items() if k != "cache_key"},
+                )
+                await session.execute(stmt)
+                await session.commit()
+        except Exception as e:
+            logger.debug("Response cache write failed: %s", e)
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import itertools
+import math
+from dataclasses import dataclass, replace
+from datetime import date, timedelta
+
+SEARCH_RESULT_CAP = 1000
+SEARCH_PAGE_SIZE = 100
+SEARCH_MAX_PAGES = SEARCH_RESULT_CAP // SEARCH_PAGE_SIZE
+
+
+@dataclass(frozen=True, slots=True)
+class SearchPartition:
+    language: str
+    min_good_first_issues: int
+    stars_min: int
+    stars_max: int | None
+    pushed_from: date
+    pushed_to: date
+
+    def render(self) -> str:
+        stars = (
+            f"stars:>={self.stars_min}" if self.stars_max is None
+            else f"stars:{self.stars_min}..{self.stars_max}"
+        )
+        pushed = f"pushed:{self.pushed_from.isoformat()}..{self.pushed_to.isoformat()}"
+        return (
+            f"good-first-issues:>{self.min_good_first_issues} {stars} {pushed} "
+            f"archived:false language:{self.language}"
+        )
+
+    def pages_needed(self, total_count: int) -> int:
+        return min(math.ceil(total_count / SEARCH_PAGE_SIZE), SEARCH_MAX_PAGES)
+
+    def split(self) -> list[SearchPartition]:
+        if self.stars_max is None:
+            mid = self.stars_min * 2
+            return [
+                replace(self, stars_max=mid - 1),
+                replace(self, stars_min=mid),
+            ]
+        if self.stars_max > self.stars_min:
+            mid = (self.stars_min + self.stars_max + 1) // 2
+            return [
+                replace(self, stars_max=mid - 1),
+                replace(self, stars_min=mid),
+            ]
+        days = (self.pushed_to - self.pushed_from).days
+        if days >= 1:
+            mid = self.pushed_from + timedelta(days=days // 2)
+            return [
+                replace(self, pushed_to=mid),
+                replace(self, pushed_from=mid + timedelta(days=1)),
+            ]
+        return []
+
+
+def discovery_partitions(
+    languages: list[str],
+    today: date,
+    recent_days: int = 60,
+) -> list[SearchPartition]:
+    pushed_from = today - timedelta(days=recent_days - 1)
+    partitions = []
+    for min_gfis, stars_min, stars_max in ((3, 501, None), (1, 100, 500)):
+        for language in languages:
+            partitions.append(SearchPartition(
+                language=language,
+                min_good_first_issues=min_gfis,
+                stars_min=stars_min,
+                stars_max=stars_max,
+                pushed_from=pushed_from,
+                pushed_to=today,
+            ))
+    return partitions
+
+
+class SearchFrontier:
+
+    def __init__(self):
+        self._open: dict[int, tuple[int, int | None]] = {}
+        self._keys = itertools.count()
+
+    def open(self, partition: SearchPartition) -> int:
+        key = next(self._keys)
+        self._open[key] = (partition.stars_min, partition.stars_max)
+        return key
+
+    def lower(self, key: int, stars_max: int):
+        stars_min, _ = self._open[key]
+        self._open[key] = (stars_min, stars_max)
+
+    def close(self, key: int):
+        self._open.pop(key, None)
+
+    def highest(self, stars_min: int, stars_max: int | None) -> float:
+        highest = -1.0
+        for lo, hi in self._open.values():
+            if (stars_max is not None and lo > stars_max) or (hi is not None and hi < stars_min):
+                continue
+            top = math.inf if hi is None else hi
+            if stars_max is not None:
+                top = min(top, stars_max)
+            highest = max(highest, top)
+        return highest
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from redis.asyncio import Redis
+
+if TYPE_CHECKING:
+    from app.services.request_scheduler import GitHubToken, TokenPool
+
+logger = logging.getLogger(__name__)
+
+
+class SharedBudgetStore:
+
+    def __init__(self, redis_url: str, namespace: str = "openfirst:github:budget", interval: float = 1.0):
+        self.redis_url = redis_url
+        self.namespace = namespace
+        self.interval = interval
+        self._redis: Redis | None = None
+        self._disabled = False
+        self._last_sync: float = 0
+        self.force = False
+
+    def _key(self, token: GitHubToken) -> str:
+        digest = hashlib.sha256((token.value or "anonymous").encode()).hexdigest()[:16]
+        return f"{self.namespace}:{digest}"
+
+    async def _client(self) -> Redis | None:
+        if self._disabled:
+            return None
+        if self._redis is None:
+            try:
+                client = Redis.from_url(self.redis_url, decode_responses=True)
+                await client.ping()
+                self._redis = client
+            except Exception as e:
+                logger.warning("Shared GitHub budgets unavailable — Redis error: %s", e)
+                self._disabled = True
+                return None
+        return self._redis
+
+    async def sync(self, pool: TokenPool):
+        now = time.monotonic()
+        if not self.force and now - self._last_sync < self.interval:
+            return
+        self._last_sync = now
+        self.force = False
+
+        redis = await self._client()
+        if redis is None:
+            return
+
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                for token in pool.tokens:
+                    pipe.hgetall(self._key(token))
+                shared = await pipe.execute()
+
+            async with redis.pipeline(transaction=False) as pipe:
+                for token, values in zip(pool.tokens, shared):
+                    self._merge(token, values)
+                    key = self._key(token)
+                    pipe.hset(key, mapping=self._snapshot(token))
+                    pipe.expire(key, 3600)
+                await pipe.execute()
+        except Exception as e:
+            logger.debug("Shared budget sync failed: %s", e)
+
+    @staticmethod
+    def _merge(token: GitHubToken, values: dict[str, str]):
+        if not values:
+            return
+        token.throttled_until = max(token.throttled_until, float(values.get("throttled_until", 0)))
+        for resource, budget in token.budgets.items():
+            reset = float(values.get(f"{resource}:reset", 0))
+            remaining = values.get(f"{resource}:remaining")
+            if remaining is None:
+                continue
+            if reset > budget.reset:
+                budget.reset = reset
+                budget.remaining = int(remaining)
+            elif reset == budget.reset:
+                budget.remaining = min(budget.remaining, int(remaining))
+
+    @staticmethod
+    def _snapshot(token: GitHubToken) -> dict[str, str]:
+        snapshot = {"throttled_until": str(token.throttled_until)}
+        for resource, budget in token.budgets.items():
+            snapshot[f"{resource}:remaining"] = str(budget.remaining)
+            snapshot[f"{resource}:reset"] = str(budget.reset)
+        return snapshot
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class StageStats:
+
+    def __init__(self, name: str, workers: int, queue: asyncio.Queue | None = None):
+        self.name = name
+        self.workers = workers
+        self.queue = queue
+        self.processed = 0
+        self.failed = 0
+        self.busy_seconds = 0.0
+        self.started = time.monotonic()
+        self.finished: float | None = None
+
+    def _elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @contextmanager
+    def busy(self) -> Iterator[None]:
+        began = time.monotonic()
+        try:
+            yield
+        finally:
+            self.busy_seconds += time.monotonic() - began
+
+    @property
+    def utilization(self) -> float:
+        elapsed = self._elapsed()
+        if not elapsed:
+            return 0.0
+        return min(self.busy_seconds / (elapsed * self.workers), 1.0)
+
+    def stats(self) -> dict:
+        elapsed = self._elapsed()
+        return {
+            "workers": self.workers,
+            "processed": self.processed,
+            "failed": self.failed,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "queue_size": self.queue.maxsize if self.queue is not None else 0,
+            "throughput_per_s": round(self.processed / elapsed, 2) if elapsed else 0.0,
+            "utilization": round(self.utilization, 3),
+        }
+
+
+class PipelineStats:
+
+    def __init__(self):
+        self.stages: dict[str, StageStats] = {}
+        self.started = time.monotonic()
+        self.finished: float | None = None
+
+    def stage(self, name: str, workers: int, queue: asyncio.Queue | None = None) -> StageStats:
+        self.stages[name] = StageStats(name, workers, queue)
+        return self.stages[name]
+
+    def finish(self):
+        self.finished = time.monotonic()
+        for stage in self.stages.values():
+            stage.finished = self.finished
+
+    @property
+    def bottleneck(self) -> str | None:
+        if not self.stages:
+            return None
+        return max(self.stages.values(), key=lambda s: s.utilization).name
+
+    def stats(self) -> dict:
+        return {
+            "running": self.finished is None,
+            "elapsed_seconds": round((self.finished or time.monotonic()) - self.started, 1),
+            "bottleneck": self.bottleneck,
+            "stages": {name: stage.stats() for name, stage in self.stages.items()},
+        }
+
+
+_last_pipeline: PipelineStats | None = None
+
+
+def start_pipeline() -> PipelineStats:
+    global _last_pipeline
+    _last_pipeline = PipelineStats()
+    return _last_pipeline
+
+
+def pipeline_stats() -> dict | None:
+    if _last_pipeline is None:
+        return None
+    return _last_pipeline.stats()
@@ -0,0 +1,317 @@
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import async_session_factory
+from app.models.sync_run import SyncRun, SyncRunItem
+from app.services.github_records import RepoRecord
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class RunState:
+    run_id: int
+    max_repos: int
+    discovery_complete: bool
+    distributed: bool = False
+    resumed: bool = False
+    pending: list[RepoRecord] = field(default_factory=list)
+    known: dict[str, int] = field(default_factory=dict)
+
+
+async def start_or_resume_run(kind: str, max_repos: int, distributed: bool = False) -> RunState:
+    now = datetime.now(timezone.utc)
+    async with async_session_factory() as session:
+        await session.execute(
+            update(SyncRun)
+            .where(
+                SyncRun.status == "running",
+                SyncRun.started_at < now - timedelta(hours=settings.sync_resume_max_age_hours),
+            )
+            .values(status="abandoned", finished_at=now)
+        )
+
+        run = (
+            await session.execute(
+                select(SyncRun)
+                .where(SyncRun.kind == kind, SyncRun.status == "running")
+                .order_by(SyncRun.started_at.desc())
+                .limit(1)
+            )
+        ).scalar_one_or_none()
+
+        if run is None:
+            run = SyncRun(
+                kind=kind, max_repos=max_repos, distributed=distributed, started_at=now, heartbeat_at=now,
+            )
+            session.add(run)
+            await session.commit()
+            return RunState(
+                run_id=run.id, max_repos=max_repos, discovery_complete=False, distributed=distributed,
+            )
+
+        items = (
+            await session.execute(
+                select(SyncRunItem.github_id, SyncRunItem.status, SyncRunItem.attempts, SyncRunItem.payload)
+                .where(SyncRunItem.run_id == run.id)
+                .order_by(SyncRunItem.id)
+            )
+        ).all()
+        await session.execute(
+            update(SyncRunItem)
+            .where(
+                SyncRunItem.run_id == run.id,
+                SyncRunItem.status != "done",
+                SyncRunItem.attempts < settings.sync_item_max_attempts,
+            )
+            .values(attempts=SyncRunItem.attempts + 1)
+        )
+        run.heartbeat_at = now
+        await session.commit()
+
+    state = RunState(
+        run_id=run.id,
+        max_repos=run.max_repos,
+        discovery_complete=run.discovery_complete,
+        distributed=run.distributed,
+        resumed=True,
+    )
+    for item in items:
+        state.known[item.github_id] = item.payload.get("stargazers_count", 0)
+        if item.status != "done" and item.attempts < settings.sync_item_max_attempts:
+            state.pending.append(RepoRecord.from_api(item.payload))
+
+    logger.info(
+        "Resuming %s sync run %d — %d of %d selected repos still pending%s",
+        kind, run.id, len(state.pending), len(items),
+        "" if run.discovery_complete else ", discovery incomplete",
+    )
+    return state
+
+
+async def last_started_run_at(kind: str, status: str = "completed") -> datetime | None:
+    async with async_session_factory() as session:
+        return (
+            await session.execute(
+                select(func.max(SyncRun.started_at)).where(SyncRun.kind == kind, SyncRun.status == status)
+            )
+        ).scalar_one_or_none()
+
+
+def _item_rows(run_id: int, repos: list[RepoRecord], status: str, attempts: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "run_id": run_id,
+            "github_id": str(r.id),
+            "full_name": r.full_name,
+            "status": status,
+            "attempts": attempts,
+            "payload": r.to_api(),
+            "updated_at": now,
+        }
+        for r in repos
+    ]
+
+
+async def add_run_items(run_id: int, repos: list[RepoRecord], discovery_complete: bool = False):
+    async with async_session_factory() as session:
+        if repos:
+            stmt = pg_insert(SyncRunItem).values(_item_rows(run_id, repos, "pending", 0))
+            await session.execute(stmt.on_conflict_do_nothing(constraint="uq_sync_run_item"))
+        await session.execute(
+            update(SyncRun)
+            .where(SyncRun.id == run_id)
+            .values(
+                discovery_complete=discovery_complete,
+                heartbeat_at=datetime.now(timezone.utc),
+            )
+        )
+        await session.commit()
+
+
+async def mark_items_done(
+    session: AsyncSession,
+    run_id: int,
+    repos: list[RepoRecord],
+    worker: str | None = None,
+):
+    if not repos:
+        return
+    stmt = pg_insert(SyncRunItem).values(_item_rows(run_id, repos, "done", 1))
+    await session.execute(
+        stmt.on_conflict_do_update(
+            constraint="uq_sync_run_item",
+            set_={
+                "status": "done",
+                "error": None,
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=SyncRunItem.claimed_by == worker if worker is not None else None,
+        )
+    )
+    await session.execute(
+        update(SyncRun)
+        .where(SyncRun.id == run_id)
+        .values(heartbeat_at=datetime.now(timezone.utc))
+    )
+
+
+async def mark_items_failed(run_id: int, errors: dict[str, str], worker: str | None = None):
+    if not errors:
+        return
+    async with async_session_factory() as session:
+        for github_id, error in errors.items():
+            stmt = update(SyncRunItem).where(
+                SyncRunItem.run_id == run_id, SyncRunItem.github_id == github_id
+            )
+            if worker is not None:
+                stmt = stmt.where(SyncRunItem.claimed_by == worker)
+            await session.execute(
+                stmt
+                .values(
+                    status="failed",
+                    error=error[:1000],
+                    updated_at=datetime.now(timezone.utc),
+                )
+            )
+        await session.commit()
+
+
+@dataclass(slots=True)
+class ClaimedItem:
+    item_id: int
+    run_id: int
+    kind: str
+    repo_data: RepoRecord
+
+
+def _claimable(now: datetime):
+    lease_cutoff = now - timedelta(minutes=settings.sync_claim_lease_minutes)
+    return and_(
+        SyncRunItem.attempts < settings.sync_item_max_attempts,
+        or_(
+            SyncRunItem.status.in_(("pending", "failed")),
+            and_(SyncRunItem.status == "claimed", SyncRunItem.claimed_at < lease_cutoff),
+        ),
+    )
+
+
+async def claim_items(worker_id: str, limit: int, run_id: int | None = None) -> list[ClaimedItem]:
+    now = datetime.now(timezone.utc)
+    candidates = (
+        select(SyncRunItem.id)
+        .join(SyncRun, SyncRun.id == SyncRunItem.run_id)
+        .where(SyncRun.status == "running", SyncRun.distributed == True, _claimable(now))  # noqa
+        .order_by(SyncRunItem.id)
+        .limit(limit)
+        .with_for_update(of=SyncRunItem, skip_locked=True)
+    )
+    if run_id is not None:
+        candidates = candidates.where(SyncRunItem.run_id == run_id)
+
+    async with async_session_factory() as session:
+        result = await session.execute(
+            update(SyncRunItem)
+            .where(SyncRunItem.id.in_(candidates.scalar_subquery()))
+            .values(
+                status="claimed",
+                claimed_by=worker_id,
+                claimed_at=now,
+                attempts=SyncRunItem.attempts + 1,
+                updated_at=now,
+            )
+            .returning(SyncRunItem.id, SyncRunItem.run_id, SyncRunItem.payload)
+            .execution_options(synchronize_session=False)
+        )
+        claimed = result.all()
+        kinds = {}
+        if claimed:
+            kinds = dict((
+                await session.execute(
+                    select(SyncRun.id, SyncRun.kind).where(SyncRun.id.in_({c.run_id for c in claimed}))
+                )
+            ).all())
+        await session.commit()
+
+    return [
+        ClaimedItem(
+            item_id=c.id, run_id=c.run_id, kind=kinds[c.run_id], repo_data=RepoRecord.from_api(c.payload),
+        )
+        for c in claimed
+    ]
+
+
+async def renew_claims(worker_id: str, item_ids: list[int]) -> int:
+    if not item_ids:
+        return 0
+    async with async_session_factory() as session:
+        result = await session.execute(
+            update(SyncRunItem)
+            .where(
+                SyncRunItem.id.in_(item_ids),
+                SyncRunItem.status == "claimed",
+                SyncRunItem.claimed_by == worker_id,
+            )
+            .values(claimed_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+    return result.rowcount
+
+
+async def has_open_items(run_id: int) -> bool:
+    now = datetime.now(timezone.utc)
+    lease_cutoff = now - timedelta(minutes=settings.sync_claim_lease_minutes)
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(SyncRunItem.id)
+            .where(
+                SyncRunItem.run_id == run_id,
+                or_(
+                    _claimable(now),
+                    and_(SyncRunItem.status == "claimed", SyncRunItem.claimed_at >= lease_cutoff),
+                ),
+            )
+            .limit(1)
+        )
+        return result.first() is not None
+
+
+async def done_github_ids(run_id: int) -> set[str]:
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(SyncRunItem.github_id).where(
+                SyncRunItem.run_id == run_id, SyncRunItem.status == "done"
+            )
+        )
+        return set(result.scalars())
+
+
+async def finish_run(run_id: int, status: str = "completed") -> int:
+    async with async_session_factory() as session:
+        result = await session.execute(
+            select(SyncRunItem.status, func.count(SyncRunItem.id))
+            .where(SyncRunItem.run_id == run_id)
+            .group_by(SyncRunItem.status)
+        )
+        by_status = dict(result.all())
+        await session.execute(
+            update(SyncRun)
+            .where(SyncRun.id == run_id)
+            .values(
+                status=status,
+                selected_count=sum(by_status.values()),
+                synced_count=by_status.get("done", 0),
+                failed_count=sum(by_status.values()) - by_status.get("done", 0),
+                finished_at=datetime.now(timezone.utc),
+            )
+        )
+        await session.commit()
+    return by_status.get("done", 0)
@@ -0,0 +1,173 @@
+import hashlib
+import hmac
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+
+from redis.asyncio import Redis
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import CacheService
+from app.models.issue import Issue
+from app.models.repository import Repository
+from app.services.github_records import IssueRecord, PullRecord, RepoRecord
+from app.services.github_sync import issue_row, refresh_unchanged_repo, upsert_issues
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EVENTS = {"push", "issues", "pull_request"}
+GOOD_FIRST_ISSUE_LABEL = "good first issue"
+DELIVERY_TTL_SECONDS = 86400
+
+
+@dataclass(slots=True)
+class WebhookResult:
+    event: str
+    action: str | None = None
+    repo_id: int | None = None
+    applied: bool = False
+    fields: list[str] = field(default_factory=list)
+    issues: list[str] = field(default_factory=list)
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(signature.removeprefix("sha256="), expected)
+
+
+async def claim_delivery(redis: Redis | None, delivery_id: str | None) -> bool:
+    if redis is None or not delivery_id:
+        return True
+    try:
+        return bool(await redis.set(
+            f"webhooks:delivery:{delivery_id}", 1, nx=True, ex=DELIVERY_TTL_SECONDS
+        ))
+    except Exception:
+        return True
+
+
+async def release_delivery(redis: Redis | None, delivery_id: str | None):
+    if redis is None or not delivery_id:
+        return
+    try:
+        await redis.delete(f"webhooks:delivery:{delivery_id}")
+    except Exception:
+        pass
+
+
+def _repository_record(data: dict) -> RepoRecord:
+    normalized = dict(data)
+    for key in ("created_at", "updated_at", "pushed_at"):
+        value = normalized.get(key)
+        if isinstance(value, (int, float)):
+            normalized[key] = datetime.fromtimestamp(value, tz=timezone.utc).isoformat()
+    return RepoRecord.from_api(normalized)
+
+
+def _is_good_first_issue(issue: IssueRecord) -> bool:
+    return any(label.lower() == GOOD_FIRST_ISSUE_LABEL for label in issue.labels)
+
+
+async def _apply_issue(session: AsyncSession, repo: Repository, action: str, data: dict) -> list[str]:
+    issue = IssueRecord.from_api(data)
+    now = datetime.now(timezone.utc)
+
+    if action != "deleted" and issue.state == "open" and _is_good_first_issue(issue):
+        changed = await upsert_issues(session, repo.id, [issue_row(issue, now)])
+    else:
+        result = await session.execute(
+            update(Issue)
+            .where(Issue.github_id == str(issue.id), Issue.state == "open")
+            .values(state="closed", closed_at=issue.closed_at or now, synced_at=now)
+            .returning(Issue.github_id)
+        )
+        changed = list(result.scalars())
+
+    if changed:
+        repo.good_first_issue_count = await session.scalar(
+            select(func.count(Issue.id)).where(
+                Issue.repo_id == repo.id,
+                Issue.state == "open",
+                Issue.is_good_first_issue == True,  # noqa
+            )
+        )
+    return changed
+
+
+def _apply_pull_request(repo: Repository, action: str, data: dict):
+    pr = PullRecord.from_api(data)
+    if action == "opened":
+        repo.open_pr_count += 1
+        return
+    if action == "reopened":
+        repo.open_pr_count += 1
+        repo.closed_pr_count = max(repo.closed_pr_count - 1, 0)
+    elif action != "closed":
+        return
+    elif pr.merged_at is None:
+        repo.open_pr_count = max(repo.open_pr_count - 1, 0)
+        repo.closed_pr_count += 1
+    else:
+        repo.open_pr_count = max(repo.open_pr_count - 1, 0)
+        repo.merged_pr_count += 1
+        if repo.last_merged_pr_at is None or pr.merged_at > repo.last_merged_pr_at:
+            repo.last_merged_pr_at = pr.merged_at
+        if pr.merged_at > datetime.now(timezone.utc) - timedelta(days=30):
+            repo.recent_merged_pr_count_30d += 1
+        if pr.created_at:
+            hours = (pr.merged_at - pr.created_at).total_seconds() / 3600
+            previous = repo.avg_pr_merge_hours if repo.avg_pr_merge_hours is not None else hours
+            repo.avg_pr_merge_hours = previous + (hours - previous) / repo.merged_pr_count
+
+    completed = repo.merged_pr_count + repo.closed_pr_count
+    repo.pr_merge_rate = round(repo.merged_pr_count / completed, 3) if completed else 0.0
+
+
+async def apply_event(session: AsyncSession, event: str, payload: dict) -> WebhookResult:
+    result = WebhookResult(event=event, action=payload.get("action"))
+    repository = payload.get("repository")
+    if event not in SUPPORTED_EVENTS or not repository:
+        return result
+
+    repo = (
+        await session.execute(
+            select(Repository).where(Repository.github_id == str(repository["id"]))
+        )
+    ).scalar_one_or_none()
+    if repo is None:
+        logger.debug("Webhook %s for untracked repo %s ignored", event, repository.get("full_name"))
+        return result
+
+    repo_data = _repository_record(repository)
+    repo.webhook_event_at = datetime.now(timezone.utc)
+
+    if event == "push":
+        if repo_data.pushed_at:
+            repo.last_pushed_at = repo_data.pushed_at
+            repo.last_commit_at = repo_data.pushed_at
+    elif event == "issues":
+        result.issues = await _apply_issue(session, repo, result.action, payload["issue"])
+    elif event == "pull_request":
+        _apply_pull_request(repo, result.action, payload["pull_request"])
+
+    changes = await refresh_unchanged_repo(session, repo, repo_data, commit=False)
+    result.repo_id = repo.id
+    result.applied = True
+    result.fields = list(changes.fields)
+    logger.info(
+        "⚡ Webhook %s%s applied to %s",
+        event, f".{result.action}" if result.action else "", repo.full_name,
+    )
+    return result
+
+
+async def invalidate_repo_caches(cache: CacheService, result: WebhookResult):
+    await cache.invalidate(f"repos:detail:{result.repo_id}")
+    await cache.invalidate_pattern(f"repos:{result.repo_id}:*")
+    await cache.invalidate_pattern("repos:list:*")
+    await cache.invalidate("stats:global")
+    if result.issues:
+        await cache.invalidate_pattern("issues:list:*")
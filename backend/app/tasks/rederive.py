@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import dataclasses
+import logging
+import time
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.core.cache import CacheService
+from app.core.dependencies import close_redis, get_redis
+from app.database import async_session_factory, engine
+from app.models.repo_payload import RepoPayload
+from app.models.repository import Repository
+from app.services.github_sync import FetchedRepo, compute_repo_metrics, write_repo
+from app.services.payload_store import PAYLOAD_VERSION, load_payload
+
+logging.basicConfig(
+    level=logging.DEBUG if settings.app_debug else logging.INFO,
+    format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def _fetched_from_store(stored: Repository, blob: bytes) -> FetchedRepo:
+    snapshot = load_payload(blob)
+    repo_data = dataclasses.replace(
+        snapshot.repo_data,
+        stargazers_count=stored.stars,
+        forks_count=stored.forks,
+        watchers_count=stored.watchers,
+        open_issues_count=stored.open_issues_count,
+        pushed_at=stored.last_pushed_at or snapshot.repo_data.pushed_at,
+    )
+    return FetchedRepo(
+        repo_data=repo_data,
+        stored=stored,
+        details=snapshot.details,
+        open_gfis=snapshot.open_gfis,
+    )
+
+
+async def rederive(batch_size: int, full_name: str | None = None, dry_run: bool = False) -> dict:
+    totals = {"repos": 0, "changed": 0, "failed": 0}
+    last_id = 0
+    started = time.monotonic()
+
+    while True:
+        async with async_session_factory() as session:
+            stmt = (
+                select(Repository, RepoPayload.payload)
+                .join(RepoPayload, RepoPayload.repo_id == Repository.id)
+                .where(Repository.id > last_id, RepoPayload.version == PAYLOAD_VERSION)
+                .order_by(Repository.id)
+                .limit(batch_size)
+            )
+            if full_name:
+                stmt = stmt.where(Repository.full_name == full_name)
+            rows = (await session.execute(stmt)).all()
+            if not rows:
+                break
+
+            for stored, blob in rows:
+                last_id = stored.id
+                totals["repos"] += 1
+                try:
+                    computed = dataclasses.replace(
+                        compute_repo_metrics(_fetched_from_store(stored, blob), store_payload=False),
+                        issue_rows={},
+                        close_missing_issues=False,
+                    )
+                    changes = await write_repo(session, computed, commit=False)
+                except Exception as e:
+                    logger.error("✗ Failed to re-derive %s: %s", stored.full_name, e)
+                    totals["failed"] += 1
+                    continue
+                if changes.changed:
+                    totals["changed"] += 1
+
+            if dry_run:
+                await session.rollback()
+            else:
+                await session.commit()
+        logger.info("Re-derived %d repos (%d changed)", totals["repos"], totals["changed"])
+
+    if totals["changed"] and not dry_run:
+        cache = CacheService(await get_redis())
+        for pattern in ("repos:*", "issues:*"):
+            await cache.invalidate_pattern(pattern)
+        await cache.invalidate("stats:global")
+
+    logger.info(
+        "═══ Re-derivation %s: %d repos, %d changed, %d failed in %.1fs ═══",
+        "dry run" if dry_run else "complete",
+        totals["repos"], totals["changed"], totals["failed"], time.monotonic() - started,
+    )
+    return totals
+
+
+async def main(args: argparse.Namespace):
+    try:
+        await rederive(args.batch_size, full_name=args.repo, dry_run=args.dry_run)
+    finally:
+        await close_redis()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute repo metrics and scores from stored GitHub payloads, without network access."
+    )
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--repo", help="only re-derive this owner/name")
+    parser.add_argument("--dry-run", action="store_true", help="report changes without writing them")
+    asyncio.run(main(parser.parse_args()))
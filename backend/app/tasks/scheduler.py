@@ -1,4 +1,6 @@
 
+import asyncio
+import functools
 import logging
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
@@ -9,24 +11,48 @@ from app.config import settings
 logger = logging.getLogger(__name__)
 
 scheduler = AsyncIOScheduler()
+_running_jobs: set[asyncio.Task] = set()
+
+
+def _tracked(func):
+    @functools.wraps(func)
+    async def run(*args, **kwargs):
+        task = asyncio.current_task()
+        _running_jobs.add(task)
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            _running_jobs.discard(task)
+    return run
 
 
 def start_scheduler():
-    from app.services.github_sync import run_full_sync
+    from app.services.github_sync import run_adaptive_refresh, run_scheduled_sync
 
     scheduler.add_job(
-        run_full_sync,
+        _tracked(run_scheduled_sync),
         trigger=IntervalTrigger(hours=settings.sync_interval_hours),
-        id="full_sync",
-        name="Full GitHub Sync",
+        id="scheduled_sync",
+        name="Scheduled GitHub Sync",
         replace_existing=True,
         kwargs={"max_repos": 200},
     )
 
+    scheduler.add_job(
+        _tracked(run_adaptive_refresh),
+        trigger=IntervalTrigger(minutes=settings.refresh_check_minutes),
+        id="adaptive_refresh",
+        name="Adaptive Repository Refresh",
+        replace_existing=True,
+    )
+
     scheduler.start()
     logger.info(
-        "Scheduler started — full sync every %d hours",
+        "Scheduler started — sync every %d hours (full once %d hours have passed), "
+        "adaptive refresh check every %d minutes",
         settings.sync_interval_hours,
+        settings.full_sync_interval_hours,
+        settings.refresh_check_minutes,
     )
 
 
@@ -34,3 +60,13 @@ def stop_scheduler():
     if scheduler.running:
         scheduler.shutdown(wait=False)
         logger.info("Scheduler stopped")
+
+
+async def cancel_running_jobs():
+    tasks = [task for task in _running_jobs if not task.done()]
+    if not tasks:
+        return
+    logger.warning("Cancelling %d running scheduler jobs", len(tasks))
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
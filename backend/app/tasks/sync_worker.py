@@ -0,0 +1,58 @@
+import argparse
+import asyncio
+import logging
+import signal
+
+from app.config import settings
+from app.services.github_client import github_client
+from app.services.github_sync import process_queue_batch, worker_id
+
+logging.basicConfig(
+    level=logging.DEBUG if settings.app_debug else logging.INFO,
+    format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def run_worker(poll_interval: float, once: bool = False):
+    worker = worker_id()
+    stopping = asyncio.Event()
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    logger.info("Sync worker %s started", worker)
+    try:
+        while not stopping.is_set():
+            try:
+                claimed = await process_queue_batch(worker)
+            except Exception as e:
+                logger.error("Sync worker batch failed: %s", e)
+                claimed = 0
+
+            if once and not claimed:
+                break
+            if not claimed:
+                try:
+                    await asyncio.wait_for(stopping.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+    finally:
+        logger.info("Sync worker %s stopping", worker)
+        await github_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Claim and sync repositories from the shared sync queue.")
+    parser.add_argument("--batch-size", type=int, default=settings.sync_claim_batch_size)
+    parser.add_argument("--poll-interval", type=float, default=settings.sync_queue_poll_seconds)
+    parser.add_argument("--once", action="store_true", help="exit once the queue is empty")
+    args = parser.parse_args()
+
+    settings.sync_claim_batch_size = args.batch_size
+    asyncio.run(run_worker(args.poll_interval, once=args.once))
+
+
+if __name__ == "__main__":
+    main()
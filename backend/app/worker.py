@@ -0,0 +1,72 @@
+import asyncio
+import logging
+import signal
+
+from sqlalchemy import text
+
+from app.config import settings
+from app.core.dependencies import close_redis
+from app.database import engine
+from app.tasks.scheduler import cancel_running_jobs, start_scheduler, stop_scheduler
+
+logging.basicConfig(
+    level=logging.DEBUG if settings.app_debug else logging.INFO,
+    format="%(asctime)s | %(levelname)-8s | %(name)s | %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+async def _wait(stopping: asyncio.Event, seconds: float) -> bool:
+    try:
+        await asyncio.wait_for(stopping.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+    return stopping.is_set()
+
+
+async def lead(stopping: asyncio.Event):
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        lock = {"lock_id": settings.scheduler_lock_id}
+
+        while not await conn.scalar(text("SELECT pg_try_advisory_lock(:lock_id)"), lock):
+            logger.debug("Scheduler lock held by another worker — standing by")
+            if await _wait(stopping, settings.scheduler_leader_retry_seconds):
+                return
+
+        logger.info("👑 Acquired scheduler lock %d — this worker is the leader", settings.scheduler_lock_id)
+        start_scheduler()
+        try:
+            while not await _wait(stopping, settings.scheduler_leader_retry_seconds):
+                await conn.scalar(text("SELECT 1"))
+        finally:
+            stop_scheduler()
+            await cancel_running_jobs()
+            if not conn.closed and not conn.invalidated:
+                await conn.scalar(text("SELECT pg_advisory_unlock(:lock_id)"), lock)
+
+
+async def main():
+    stopping = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopping.set)
+
+    logger.info("🚀 Starting OpenFirst sync worker v%s", settings.app_version)
+    try:
+        while not stopping.is_set():
+            try:
+                await lead(stopping)
+            except Exception as e:
+                logger.error("Lost scheduler leadership: %s", e)
+                await _wait(stopping, settings.scheduler_leader_retry_seconds)
+    finally:
+        logger.info("🛑 Shutting down OpenFirst sync worker")
+        from app.services.github_client import github_client
+        await github_client.close()
+        await close_redis()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
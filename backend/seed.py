@@ -11,7 +11,8 @@ from app.services.github_sync import run_full_sync
 async def main():
     print("Starting initial GitHub sync...")
     print("This will fetch repos from GitHub and populate your database.")
-    print("This may take a few minutes depending on rate limits.\n")
+    print("This may take a few minutes depending on rate limits.")
+    print("If interrupted, run it again to resume where it stopped.\n")
 
     await run_full_sync(max_repos=500)
 
@@ -0,0 +1,9 @@
+from app.models.repository import Repository  # noqa: F401
+from app.models.issue import Issue  # noqa: F401
+from app.models.metrics_history import RepoMetricsHistory  # noqa: F401
+from app.models.language import RepoLanguage  # noqa: F401
+from app.models.subscription import UserSubscription  # noqa: F401
+from app.models.notification import Notification  # noqa: F401
+from app.models.github_cache import GitHubResponseCache  # noqa: F401
+from app.models.sync_run import SyncRun, SyncRunItem  # noqa: F401
+from app.models.repo_payload import RepoPayload  # noqa: F401
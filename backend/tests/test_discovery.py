@@ -0,0 +1,161 @@
+import asyncio
+import bisect
+import random
+import re
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+import pytest
+
+from app.services import github_sync
+from app.services.github_records import RepoRecord
+from app.services.github_sync import (
+    CandidateBands,
+    iter_discovered_repositories,
+    iter_selected_repositories,
+)
+
+QUERY_RE = re.compile(
+    r"good-first-issues:>(?P<gfi>\d+) stars:(?:>=(?P<min>\d+)|(?P<lo>\d+)\.\.(?P<hi>\d+)) "
+    r"pushed:(?P<from>\S+)\.\.(?P<to>\S+)"
+)
+
+
+class FakeSearch:
+
+    def __init__(self, size: int, seed: int = 1):
+        rng = random.Random(seed)
+        today = datetime.now(timezone.utc).date()
+        self.repos = sorted(
+            (
+                (
+                    int(100 * (1 / (1 - rng.random())) ** 0.8),
+                    i,
+                    today - timedelta(days=rng.randint(0, 59)),
+                    rng.randint(1, 10),
+                )
+                for i in range(size)
+            ),
+            key=lambda r: (-r[0], -r[1]),
+        )
+        self.neg_stars = [-r[0] for r in self.repos]
+        self.calls = 0
+
+    def matches(self, query: str):
+        q = QUERY_RE.search(query)
+        gfi = int(q["gfi"])
+        lo = int(q["min"] or q["lo"])
+        hi = int(q["hi"]) if q["hi"] else None
+        pushed_from = datetime.fromisoformat(q["from"]).date()
+        pushed_to = datetime.fromisoformat(q["to"]).date()
+        start = 0 if hi is None else bisect.bisect_left(self.neg_stars, -hi)
+        end = bisect.bisect_right(self.neg_stars, -lo)
+        return (
+            self.repos[i] for i in range(start, end)
+            if self.repos[i][3] > gfi and pushed_from <= self.repos[i][2] <= pushed_to
+        )
+
+    async def __call__(self, query, sort, order, per_page, page):
+        assert (sort, order) == ("stars", "desc")
+        self.calls += 1
+        total = sum(1 for _ in self.matches(query))
+        items = islice(self.matches(query), (page - 1) * per_page, page * per_page) if page <= 10 else ()
+        return {
+            "total_count": total,
+            "items": [
+                RepoRecord(
+                    id=r[1], full_name=f"owner/repo-{r[1]}", stargazers_count=r[0],
+                    description="x" * 200, topics=["python", "good-first-issue"],
+                )
+                for r in items
+            ],
+        }
+
+    def expected(self, gfi: int, lo: int, hi: int | None, limit: int) -> list[int]:
+        hits = (r for r in self.repos if r[3] > gfi and r[0] >= lo and (hi is None or r[0] <= hi))
+        return [r[1] for r in islice(hits, limit)]
+
+
+@pytest.fixture
+def search(monkeypatch):
+    def install(size: int) -> FakeSearch:
+        fake = FakeSearch(size)
+        monkeypatch.setattr(github_sync.github_client, "search_repositories", fake)
+        monkeypatch.setattr(github_sync.settings, "discovery_languages", "Python")
+        return fake
+    return install
+
+
+async def discover(bands: CandidateBands) -> int:
+    seen = 0
+    async for repo_data in iter_discovered_repositories():
+        seen += 1
+        bands.push(repo_data)
+    return seen
+
+
+async def select(bands: CandidateBands, fake: FakeSearch) -> list[tuple[int, list[RepoRecord]]]:
+    return [(fake.calls, batch) async for batch in iter_selected_repositories(bands)]
+
+
+def test_discovery_selects_exact_top_repos(search):
+    fake = search(20_000)
+    bands = CandidateBands(120, 80)
+    asyncio.run(discover(bands))
+
+    assert [r.id for r in bands.tops["popular"].ranked()] == fake.expected(3, 501, None, 120)
+    assert [r.id for r in bands.tops["small"].ranked()] == fake.expected(1, 100, 500, 80)
+
+
+def test_selection_streams_exact_top_repos(search):
+    fake = search(20_000)
+    batches = asyncio.run(select(CandidateBands(120, 80), fake))
+    released = [repo_data for _, batch in batches for repo_data in batch]
+
+    assert [r.id for r in released if r.stargazers_count > 500] == fake.expected(3, 501, None, 120)
+    assert [r.id for r in released if r.stargazers_count <= 500] == fake.expected(1, 100, 500, 80)
+    first_calls, first_batch = batches[0]
+    assert first_calls < fake.calls
+    assert first_batch[0].id == fake.expected(3, 501, None, 1)[0]
+
+
+def test_selection_skips_known_repos(search):
+    fake = search(5_000)
+    known = {str(i) for i in fake.expected(3, 501, None, 10)}
+    batches = asyncio.run(select(CandidateBands(20, 0, skip=known), fake))
+
+    assert [r.id for _, batch in batches for r in batch] == fake.expected(3, 501, None, 30)[10:]
+
+
+def test_discovery_is_bounded_by_selection_size(search):
+    fake = search(20_000)
+    seen_all = asyncio.run(discover(CandidateBands(120, 80)))
+    calls_all = fake.calls
+
+    fake.calls = 0
+    bands = CandidateBands(120, 80)
+    asyncio.run(select(bands, fake))
+
+    assert bands.seen < seen_all / 4
+    assert fake.calls < calls_all / 4
+
+
+def peak_discovery_memory(size: int, install) -> int:
+    install(size)
+    bands = CandidateBands(120, 80)
+    tracemalloc.start()
+    try:
+        seen = asyncio.run(discover(bands))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert seen > size // 10
+    return peak
+
+
+def test_discovery_memory_stays_flat(search):
+    small = peak_discovery_memory(10_000, search)
+    large = peak_discovery_memory(100_000, search)
+
+    assert large < small * 1.5 + 256 * 1024
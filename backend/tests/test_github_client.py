@@ -0,0 +1,9 @@
+import httpx
+
+from app.services.github_client import GitHubClient
+
+
+def test_bare_429_is_a_throttle_not_a_forbidden():
+    assert GitHubClient._retry_after(httpx.Response(429, text="Too Many Requests")) == 60.0
+    assert GitHubClient._retry_after(httpx.Response(429, headers={"retry-after": "7"})) == 7.0
+    assert GitHubClient._retry_after(httpx.Response(403, text="Resource not accessible")) is None
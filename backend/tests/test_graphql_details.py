@@ -0,0 +1,68 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.services.github_client import GitHubClient, _graphql_repo_to_details
+
+
+def node(**files) -> dict:
+    return {key: {"entries": [{"name": name} for name in names]} for key, names in files.items()}
+
+
+@pytest.mark.parametrize("files", [
+    {"rootFiles": ["setup.py", "README.md"]},
+    {"rootFiles": ["readme.md"]},
+    {"rootFiles": ["README.rst", "src"]},
+    {"rootFiles": ["README"]},
+    {"rootFiles": ["src"], "githubFiles": ["README.md"]},
+    {"rootFiles": ["src"], "docsFiles": ["readme.txt"]},
+])
+def test_readme_is_detected_like_the_community_profile(files):
+    details = _graphql_repo_to_details(node(**files))
+    assert details["community"]["files"]["readme"] is not None
+
+
+def test_missing_readme_and_missing_directories():
+    details = _graphql_repo_to_details({"rootFiles": {"entries": [{"name": "src"}]}, "docsFiles": None})
+    assert details["community"]["files"]["readme"] is None
+
+
+def test_pull_counts_use_one_graphql_query(monkeypatch):
+    client = GitHubClient()
+    calls = []
+
+    async def fake_graphql(query, variables=None):
+        calls.append((query, variables))
+        return {alias: {"issueCount": i} for i, alias in enumerate(variables) if alias != "open"}
+
+    monkeypatch.setattr(client, "graphql", fake_graphql)
+    counts = asyncio.run(client.get_repo_pull_counts("octo", "cat", date(2026, 1, 2)))
+
+    assert len(calls) == 1
+    query, variables = calls[0]
+    assert query.count("search(type: ISSUE") == 5
+    assert variables["merged_30d"] == "repo:octo/cat is:pr is:merged merged:>=2026-01-02"
+    assert counts == {"merged": 0, "closed": 1, "open": 0, "merged_30d": 3, "closed_30d": 4}
+
+
+def test_batch_query_carries_pull_counts(monkeypatch):
+    client = GitHubClient()
+    calls = []
+
+    async def fake_graphql(query, variables=None):
+        calls.append((query, variables))
+        return {
+            "r0": {}, "r0_merged": {"issueCount": 7}, "r0_closed_30d": {"issueCount": 2},
+            "r1": {}, "r1_open": {"issueCount": 3},
+        }
+
+    monkeypatch.setattr(client, "graphql", fake_graphql)
+    details = asyncio.run(client.get_repo_details_batch(["octo/cat", "octo/dog"], pr_counts_since=date(2026, 1, 2)))
+
+    assert len(calls) == 1
+    query, variables = calls[0]
+    assert query.count("search(type: ISSUE") == 10
+    assert variables["r1_closed"] == "repo:octo/dog is:pr is:closed is:unmerged"
+    assert details["octo/cat"]["pr_counts"] == {"merged": 7, "closed": 0, "open": 0, "merged_30d": 0, "closed_30d": 2}
+    assert details["octo/dog"]["pr_counts"]["open"] == 3
@@ -0,0 +1,58 @@
+import asyncio
+from datetime import date
+
+import httpx
+import orjson
+
+from app.replay.fake_server import FixtureIndex
+from app.replay.fixtures import recording_date
+from app.replay.recorder import FixtureRecorder
+from app.services import github_sync
+
+
+def write_fixture(directory, name, path, query, body=b"{}"):
+    fixture = {"method": "GET", "path": path, "query": query, "status": 200, "headers": {}, "body": body.decode()}
+    (directory / f"{name}.json").write_bytes(orjson.dumps(fixture))
+
+
+def test_search_misses_do_not_fall_back(tmp_path):
+    write_fixture(tmp_path, "search", "/search/repositories", "q=stars%3A%3E10+pushed%3A%3E%3D2026-01-01&page=1")
+    index = FixtureIndex(tmp_path)
+
+    assert index.match("GET", "/search/repositories", "page=1&q=stars%3A%3E10+pushed%3A%3E%3D2026-01-01", b"")
+    assert index.match("GET", "/search/repositories", "q=stars%3A%3E10+pushed%3A%3E%3D2026-02-01&page=1", b"") is None
+
+
+def test_other_paths_fall_back_by_page(tmp_path):
+    write_fixture(tmp_path, "first", "/repos/o/r/issues", "labels=a&page=1")
+    write_fixture(tmp_path, "second", "/repos/o/r/issues", "labels=a&page=2")
+    index = FixtureIndex(tmp_path)
+
+    assert index.match("GET", "/repos/o/r/issues", "labels=b&page=2", b"")["query"] == "labels=a&page=2"
+
+
+def test_recording_date_is_kept_with_the_fixtures(tmp_path):
+    recorder = FixtureRecorder(tmp_path)
+    request = httpx.Request("GET", "https://api.github.com/repos/o/r")
+    asyncio.run(recorder(httpx.Response(200, json={"id": 1}, request=request)))
+
+    assert recording_date(tmp_path) is not None
+    assert len(FixtureIndex(tmp_path).by_key) == 1
+
+
+def test_discovery_queries_use_the_pinned_date(monkeypatch):
+    queries = []
+
+    async def fake_search(query, **kwargs):
+        queries.append(query)
+        return {"total_count": 0, "items": []}
+
+    monkeypatch.setattr(github_sync.github_client, "search_repositories", fake_search)
+    monkeypatch.setattr(github_sync.settings, "discovery_languages", "Python")
+    monkeypatch.setattr(github_sync.settings, "sync_today", date(2025, 3, 1))
+
+    async def drain():
+        return [repo async for repo in github_sync.iter_discovered_repositories()]
+
+    assert asyncio.run(drain()) == []
+    assert queries and all("pushed:2025-01-01..2025-03-01" in query for query in queries)
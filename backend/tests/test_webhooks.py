@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import hmac
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from app.models.repository import Repository
+from app.services import webhooks
+from app.services.github_sync import RepoChangeSet
+
+FIXTURES = Path(__file__).parent / "fixtures" / "webhooks"
+SECRET = "It's a Secret to Everybody"
+
+
+def load(name: str) -> dict:
+    return json.loads((FIXTURES / name).read_text())
+
+
+def sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+class FakeResult:
+
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+    def scalars(self):
+        return list(self.value)
+
+
+class FakeSession:
+
+    def __init__(self, repo: Repository | None, closed_ids=(), open_gfis: int = 0):
+        self.repo = repo
+        self.closed_ids = list(closed_ids)
+        self.open_gfis = open_gfis
+        self.updates = []
+
+    async def execute(self, stmt):
+        if stmt.is_select:
+            return FakeResult(self.repo)
+        self.updates.append(stmt)
+        return FakeResult(self.closed_ids)
+
+    async def scalar(self, stmt):
+        return self.open_gfis
+
+
+@pytest.fixture
+def repo() -> Repository:
+    return Repository(
+        id=7,
+        github_id="1296269",
+        full_name="octo-org/hello-world",
+        open_pr_count=4,
+        closed_pr_count=2,
+        merged_pr_count=6,
+        recent_merged_pr_count_30d=1,
+        avg_pr_merge_hours=10.0,
+        pr_merge_rate=0.75,
+        good_first_issue_count=3,
+    )
+
+
+@pytest.fixture
+def applied(monkeypatch):
+    calls = {"upserted": [], "refreshed": []}
+
+    async def upsert_issues(session, repo_id, rows):
+        calls["upserted"].extend(rows)
+        return [row["github_id"] for row in rows]
+
+    async def refresh_unchanged_repo(session, stored, repo_data, commit=True):
+        calls["refreshed"].append(repo_data)
+        return RepoChangeSet(repo=stored)
+
+    monkeypatch.setattr(webhooks, "upsert_issues", upsert_issues)
+    monkeypatch.setattr(webhooks, "refresh_unchanged_repo", refresh_unchanged_repo)
+    return calls
+
+
+def test_verify_signature_accepts_github_signature():
+    body = (FIXTURES / "push.json").read_bytes()
+    assert webhooks.verify_signature(SECRET, body, sign(body))
+
+
+@pytest.mark.parametrize("signature", [
+    None,
+    "",
+    "sha1=0123456789abcdef",
+    sign(b"{}"),
+    sign((FIXTURES / "push.json").read_bytes(), secret="wrong"),
+])
+def test_verify_signature_rejects_bad_signatures(signature):
+    body = (FIXTURES / "push.json").read_bytes()
+    assert not webhooks.verify_signature(SECRET, body, signature)
+
+
+def test_issue_labeled_good_first_issue_is_upserted(repo, applied):
+    session = FakeSession(repo, open_gfis=4)
+    result = asyncio.run(webhooks.apply_event(session, "issues", load("issues_labeled.json")))
+
+    assert result.applied and result.repo_id == 7
+    assert result.issues == ["1825434611"]
+    row = applied["upserted"][0]
+    assert row["title"] == "Document the --verbose flag"
+    assert row["html_url"] == "https://github.com/octo-org/hello-world/issues/1347"
+    assert row["labels"] == ["good first issue", "documentation"]
+    assert row["state"] == "open"
+    assert repo.good_first_issue_count == 4
+    assert repo.webhook_event_at is not None
+    assert not session.updates
+
+
+@pytest.mark.parametrize("fixture", ["issues_unlabeled.json", "issues_closed.json"])
+def test_issue_leaving_good_first_issues_is_closed(repo, applied, fixture):
+    session = FakeSession(repo, closed_ids=["1825434611"], open_gfis=2)
+    result = asyncio.run(webhooks.apply_event(session, "issues", load(fixture)))
+
+    assert result.issues == ["1825434611"]
+    assert not applied["upserted"]
+    assert len(session.updates) == 1
+    assert repo.good_first_issue_count == 2
+
+
+def test_issue_that_was_not_tracked_leaves_count_alone(repo, applied):
+    session = FakeSession(repo, closed_ids=[], open_gfis=0)
+    result = asyncio.run(webhooks.apply_event(session, "issues", load("issues_unlabeled.json")))
+
+    assert result.issues == []
+    assert repo.good_first_issue_count == 3
+
+
+def test_pull_request_merged_updates_counters(repo, applied):
+    result = asyncio.run(
+        webhooks.apply_event(FakeSession(repo), "pull_request", load("pull_request_closed_merged.json"))
+    )
+
+    assert result.applied
+    assert repo.open_pr_count == 3
+    assert repo.merged_pr_count == 7
+    assert repo.closed_pr_count == 2
+    assert repo.last_merged_pr_at == datetime(2026, 10, 16, 12, tzinfo=timezone.utc)
+    assert repo.avg_pr_merge_hours == pytest.approx(10.0 + (48.0 - 10.0) / 7)
+    assert repo.pr_merge_rate == round(7 / 9, 3)
+
+
+def test_pull_request_reopened_moves_it_back_to_open(repo, applied):
+    asyncio.run(webhooks.apply_event(FakeSession(repo), "pull_request", load("pull_request_reopened.json")))
+
+    assert repo.open_pr_count == 5
+    assert repo.closed_pr_count == 1
+    assert repo.merged_pr_count == 6
+    assert repo.pr_merge_rate == round(6 / 7, 3)
+
+
+def test_push_updates_push_time_from_unix_timestamp(repo, applied):
+    result = asyncio.run(webhooks.apply_event(FakeSession(repo), "push", load("push.json")))
+
+    pushed_at = datetime.fromtimestamp(1792140839, tz=timezone.utc)
+    assert result.applied
+    assert repo.last_pushed_at == pushed_at
+    assert repo.last_commit_at == pushed_at
+    assert applied["refreshed"][0].pushed_at == pushed_at
+    assert applied["refreshed"][0].created_at == datetime.fromtimestamp(1296068472, tz=timezone.utc)
+
+
+def test_event_for_untracked_repo_is_ignored(applied):
+    result = asyncio.run(webhooks.apply_event(FakeSession(None), "push", load("push.json")))
+
+    assert not result.applied
+    assert not applied["refreshed"]
+
+
+def test_unsupported_event_is_ignored(repo, applied):
+    result = asyncio.run(webhooks.apply_event(FakeSession(repo), "star", {"repository": {"id": 1}}))
+
+    assert not result.applied